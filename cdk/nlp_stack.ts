@@ -10,6 +10,8 @@ import * as sns from 'aws-cdk-lib/aws-sns';
 import * as subs from 'aws-cdk-lib/aws-sns-subscriptions';
 import * as cloudwatchActions from 'aws-cdk-lib/aws-cloudwatch-actions';
 import * as iam from 'aws-cdk-lib/aws-iam';
+import * as events from 'aws-cdk-lib/aws-events';
+import * as targets from 'aws-cdk-lib/aws-events-targets';
 import { Platform } from 'aws-cdk-lib/aws-ecr-assets';
 
 dotenv.config();
@@ -86,6 +88,7 @@ export class NlpStack extends cdk.Stack {
     });
 
     // Add the specific EventBridge rule policy to the Lambda function's role
+    // (still needed to clean up per-batch rules created before the batch poller)
     lambdaFunction.addToRolePolicy(eventBridgeRulePolicy);
 
     // Grant EventBridge permissions to send messages to the SQS queue
@@ -97,10 +100,22 @@ export class NlpStack extends cdk.Stack {
       resources: [props.coreStack.nlpSQSQueue.queueArn]
     }));
 
+    // One schedule checks every outstanding extraction batch; batches back off individually
+    const batchPollerRule = new events.Rule(this, 'BatchPollerRule', {
+      schedule: events.Schedule.rate(cdk.Duration.minutes(2)),
+    });
+
+    batchPollerRule.addTarget(new targets.SqsQueue(props.coreStack.nlpSQSQueue, {
+      message: events.RuleTargetInput.fromObject({
+        "action": "e_batch_poller"
+      })
+    }));
+
     // Grant Lambda permissions to be triggered by the queue
     lambdaFunction.addEventSource(
       new lambdaEventSources.SqsEventSource(props.coreStack.nlpSQSQueue, {
-        batchSize: 1, // Process one message at a time
+        batchSize: 10, // Up to DISPATCH_WORKERS messages are processed concurrently
+        reportBatchItemFailures: true, // Only failed messages are retried
       })
     );
   }
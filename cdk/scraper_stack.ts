@@ -167,6 +167,12 @@ export class ScraperStack extends cdk.Stack {
     props.coreStack.s3Bucket.grantReadWrite(scraperLambdaRole);
     props.coreStack.s3ScraperBucket.grantReadWrite(scraperLambdaRole);
 
+    // Containers processing scraper messages at once, all on one Congress.gov API key
+    const scraperMaxConcurrency = 3;
+    // Listing pages processed at once per container. Each page runs its own hydrate
+    // thread pool and PDF process pool, so memory is sized for this many pages.
+    const scraperPagesPerContainer = 2;
+
     const lambdaFunction = new lambda.DockerImageFunction(this, 'ScraperFunction', {
       code: lambda.DockerImageCode.fromImageAsset('src', {
         platform: Platform.LINUX_AMD64,
@@ -174,7 +180,7 @@ export class ScraperStack extends cdk.Stack {
         file: 'scraper-lambda/Dockerfile'
       }),
       timeout: cdk.Duration.minutes(15),
-      memorySize: 1024,
+      memorySize: 2048, // ~1 GB per concurrent page
       architecture: lambda.Architecture.X86_64,
       environment: {
         BUCKET_NAME: props.coreStack.s3Bucket.bucketName,
@@ -184,7 +190,10 @@ export class ScraperStack extends cdk.Stack {
         CONGRESS_API_KEY: process.env.CONGRESS_API_KEY!,
         DB_ACCESS_URL: process.env.DB_ACCESS_URL!,
         DB_URI: process.env.DB_URI!,
-        SCRAPER_QUEUE_ARN: this.scraperSQSQueue.queueArn
+        SCRAPER_QUEUE_ARN: this.scraperSQSQueue.queueArn,
+        DISPATCH_WORKERS: String(scraperPagesPerContainer),
+        // Every concurrent container gets an equal share of the API key's hourly quota
+        CONGRESS_RATE_LIMIT_SHARERS: String(scraperMaxConcurrency)
 
       },
       role: scraperLambdaRole,
@@ -217,7 +226,9 @@ export class ScraperStack extends cdk.Stack {
     // Grant Lambda permissions to be triggered by the queue
     lambdaFunction.addEventSource(
         new lambdaEventSources.SqsEventSource(this.scraperSQSQueue, {
-        batchSize: 1, // Process 1 message at a time
+        batchSize: scraperPagesPerContainer, // Pages are processed concurrently, one per DISPATCH_WORKERS thread
+        reportBatchItemFailures: true, // Only failed messages are retried
+        maxConcurrency: scraperMaxConcurrency, // Fanned-out pages share one Congress.gov API key
         })
     );
 
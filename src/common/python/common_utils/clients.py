@@ -0,0 +1,73 @@
+import functools
+import os
+import threading
+
+# Shared service clients, built on first use and reused for the life of the container.
+# Importing this module is free: each SDK is only imported by the first call that needs
+# it, so an action never pays for clients it does not use.
+
+
+def memoized(factory):
+    """Call factory once per distinct arguments, even when first called from several threads."""
+    cache = {}
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get(*args):
+        if args not in cache:
+            with lock:
+                if args not in cache:
+                    cache[args] = factory(*args)
+        return cache[args]
+
+    return get
+
+
+@memoized
+def mongo_db(name='auxiom_database'):
+    from pymongo.mongo_client import MongoClient
+    from pymongo.server_api import ServerApi
+
+    client = MongoClient(os.environ.get("DB_URI"), server_api=ServerApi('1'))
+    return client[name]
+
+
+def bills_collection():
+    return mongo_db()['bills']
+
+
+def events_collection():
+    return mongo_db()['events']
+
+
+def extraction_cache_collection():
+    return mongo_db()['extraction_cache']
+
+
+def extraction_batches_collection():
+    return mongo_db()['extraction_batches']
+
+
+def scraper_runs_collection():
+    return mongo_db()['scraper_runs']
+
+
+@memoized
+def anthropic_client():
+    import anthropic
+
+    return anthropic.Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY'))
+
+
+@memoized
+def genai_client():
+    from google import genai
+
+    return genai.Client(api_key=os.environ.get('GOOGLE_API_KEY'))
+
+
+@memoized
+def aws_client(service):
+    import boto3
+
+    return boto3.client(service)
@@ -1,3 +1,9 @@
+import time
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
 def test_connection(client):
     """
     Test the MongoDB connection.
@@ -17,33 +23,120 @@ def test_connection(client):
         print(f"Error connecting to MongoDB: {e}")
         return False
 
-def get_all_bills(bill_collection):
+# Length of the stored text, computed server-side for bills stored before text_length was recorded
+_TEXT_LENGTH = {"$ifNull": ["$text_length", {"$strLenCP": {"$ifNull": ["$text", ""]}}]}
+
+# Named field profiles for bill reads. Whole bill documents carry the bill text (often
+# megabytes), embeddings and the full action history, so each reader asks for its fields only.
+BILL_PROFILES = {
+    # Listing metadata compared by ingest before hydrating a bill
+    "change_detection": {"bill_id": 1, "update_date": 1, "update_date_including_text": 1, "latest_action": 1},
+    # Stored state ingest compares a hydrated bill against, and reuses unchanged sub-resources from
+    "ingest_compare": {
+        "bill_id": 1, "latest_action_date": 1, "actions": 1, "subjects": 1,
+        "text_version": 1, "section_hashes": 1, "text_length": _TEXT_LENGTH
+    },
+    # Bill fields copied onto extracted events
+    "event_context": {
+        "bill_id": 1, "title": 1, "actions": {"$slice": -1}, "status": 1,
+        "latest_action_date": 1, "events": 1, "pending_sections": 1, "extraction_attempts": 1,
+        "cached_chunks": 1
+    },
+    # Bill text and current events for event extraction
+    "extraction_input": {"bill_id": 1, "text": 1, "text_ref": 1, "events": 1, "cached_chunks": 1},
+    # Fields needed to rebuild a Bill object from a stored bill
+    "identity": {"bill_id": 1, "congress": 1, "bill_type": 1, "bill_number": 1, "title": 1},
+    # Text length without the text itself
+    "text_stats": {"bill_id": 1, "text_length": _TEXT_LENGTH},
+    # Inputs of the bill text embedding, and whether one already exists
+    "vectorize_input": {
+        "bill_id": 1, "text": 1, "text_ref": 1, "title": 1, "people": 1, "summary": 1,
+        "has_text_embedding": {"$gt": ["$text_embedding", None]}
+    },
+}
+
+
+def _projection(profile=None, projection=None):
+    """Mongo projection for a named profile, or the explicit projection (None returns whole documents)."""
+    if profile is None:
+        return projection
+    if profile not in BILL_PROFILES:
+        raise ValueError(f"Unknown bill profile: {profile}")
+    return BILL_PROFILES[profile]
+
+
+def get_all_bills(bill_collection, profile=None):
+    projection = _projection(profile)
     try:
-        return list(bill_collection.find())
+        return list(bill_collection.find({}, projection))
     except Exception as e:
         print(f"Error getting all bills: {e}")
         return []
 
 
-def get_bill(bills_collection, bill_id):
+def get_bill(bills_collection, bill_id, profile=None):
     """
     Check if a bill already exists in the database.
     
     Args:
         bills_collection: MongoDB collection instance
         bill_id (str): The unique bill ID (e.g., "hr123-118")
+        profile (str): Optional BILL_PROFILES name limiting the returned fields
     
     Returns:
         dict or None: The existing bill document if found, None otherwise
     """
+    projection = _projection(profile)
     try:
-        existing_bill = bills_collection.find_one({"bill_id": bill_id})
+        existing_bill = bills_collection.find_one({"bill_id": bill_id}, projection)
         return existing_bill
     except Exception as e:
         print(f"Error checking if bill exists: {e}")
         return None
 
 
+def get_bills(bills_collection, bill_ids, projection=None, profile=None):
+    """
+    Fetch many bills with a single query.
+
+    Args:
+        bills_collection: MongoDB collection instance
+        bill_ids (list): Bill IDs to look up
+        projection (dict): Optional MongoDB projection to limit the returned fields
+        profile (str): Optional BILL_PROFILES name, used instead of projection
+
+    Returns:
+        dict: Stored bill documents keyed by bill_id; missing bills are absent
+    """
+    if not bill_ids:
+        return {}
+    projection = _projection(profile, projection)
+    try:
+        cursor = bills_collection.find({"bill_id": {"$in": list(bill_ids)}}, projection)
+        return {bill["bill_id"]: bill for bill in cursor}
+    except Exception as e:
+        print(f"Error getting bills: {e}")
+        return {}
+
+
+def iter_bills(bills_collection, bill_ids, profile=None, batch_size=100):
+    """
+    Stream stored bills in server-side batches instead of loading them all at once.
+
+    Args:
+        bills_collection: MongoDB collection instance
+        bill_ids (list): Bill IDs to look up
+        profile (str): Optional BILL_PROFILES name
+        batch_size (int): Bills fetched per round trip
+
+    Yields:
+        dict: Stored bill documents; missing bills are skipped
+    """
+    if not bill_ids:
+        return
+    yield from bills_collection.find({"bill_id": {"$in": list(bill_ids)}}, _projection(profile), batch_size=batch_size)
+
+
 def insert_bill(bills_collection, bill_data):
     """
     Insert a new bill into the database.
@@ -72,6 +165,16 @@ def delete_bill(bills_collection,  id):
         print(f"Error deleting bill: {e}")
         return False
 
+def _bill_update(bill_data):
+    # Text lives either inline or in the text store (see text_store); drop whichever copy is stale
+    update = {"$set": bill_data}
+    if "text_ref" in bill_data:
+        update["$unset"] = {"text": ""}
+    elif "text" in bill_data:
+        update["$unset"] = {"text_ref": ""}
+    return update
+
+
 def update_bill(bills_collection, bill_data):
     """
     Update an existing bill in the database.
@@ -87,7 +190,7 @@ def update_bill(bills_collection, bill_data):
     try:
         result = bills_collection.update_one(
             {"bill_id": bill_data['bill_id']},
-            {"$set": bill_data}
+            _bill_update(bill_data)
         )
         
         if result.modified_count > 0:
@@ -101,6 +204,72 @@ def update_bill(bills_collection, bill_data):
         return False
 
 
+def upsert_bills(bills_collection, bills_data):
+    """
+    Insert or update many bills with one unordered bulk write.
+
+    Args:
+        bills_collection: MongoDB collection instance
+        bills_data (list): Bill data dicts, each with a bill_id
+
+    Returns:
+        list: Per-bill result in input order - "inserted", "updated" (matched an
+        existing bill, possibly without changes) or "failed"
+    """
+    if not bills_data:
+        return []
+
+    requests = [UpdateOne({"bill_id": bill_data['bill_id']}, _bill_update(bill_data), upsert=True) for bill_data in bills_data]
+    results = ["updated"] * len(bills_data)
+    try:
+        result = bills_collection.bulk_write(requests, ordered=False)
+        upserted = result.upserted_ids
+    except BulkWriteError as e:
+        # Unordered: every other write was still applied
+        for error in e.details.get("writeErrors", []):
+            results[error["index"]] = "failed"
+            print(f"Error writing bill {bills_data[error['index']]['bill_id']}: {error.get('errmsg')}")
+        upserted = {upsert["index"]: upsert["_id"] for upsert in e.details.get("upserted", [])}
+    except Exception as e:
+        print(f"Error writing bills: {e}")
+        return ["failed"] * len(bills_data)
+
+    for index in upserted:
+        results[index] = "inserted"
+
+    print(f"Wrote {len(bills_data)} bills: {results.count('inserted')} inserted, {results.count('updated')} updated, {results.count('failed')} failed")
+    return results
+
+
+def update_bills(bills_collection, bills_data):
+    """
+    Update many existing bills with one unordered bulk write.
+
+    Args:
+        bills_collection: MongoDB collection instance
+        bills_data (list): Bill data dicts, each with a bill_id
+
+    Returns:
+        list: Per-bill True, or False if its write failed
+    """
+    if not bills_data:
+        return []
+
+    requests = [UpdateOne({"bill_id": bill_data['bill_id']}, _bill_update(bill_data)) for bill_data in bills_data]
+    results = [True] * len(bills_data)
+    try:
+        result = bills_collection.bulk_write(requests, ordered=False)
+        print(f"Updated {result.modified_count} of {len(bills_data)} bills")
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            results[error["index"]] = False
+            print(f"Error updating bill {bills_data[error['index']]['bill_id']}: {error.get('errmsg')}")
+    except Exception as e:
+        print(f"Error updating bills: {e}")
+        return [False] * len(bills_data)
+    return results
+
+
 def insert_event(events_collection, event_data):
     """
     Insert a new event into the database.
@@ -120,9 +289,64 @@ def insert_event(events_collection, event_data):
         print(f"Error inserting new event: {e}")
         return False
 
+def insert_events(events_collection, events_data):
+    """
+    Insert many events with one unordered insert_many.
+
+    Args:
+        events_collection: MongoDB collection instance
+        events_data (list): Event documents
+
+    Returns:
+        list: Per-event True, or False if its insert failed
+    """
+    if not events_data:
+        return []
+
+    results = [True] * len(events_data)
+    try:
+        events_collection.insert_many(events_data, ordered=False)
+    except BulkWriteError as e:
+        # Unordered: every other event was still inserted
+        for error in e.details.get("writeErrors", []):
+            results[error["index"]] = False
+            print(f"Error inserting event {events_data[error['index']].get('id')}: {error.get('errmsg')}")
+    except Exception as e:
+        print(f"Error inserting events: {e}")
+        return [False] * len(events_data)
+    print(f"Inserted {results.count(True)} of {len(events_data)} events")
+    return results
+
+
+def get_events(events_collection, event_ids, projection=None):
+    """
+    Fetch many events by id with a single query.
+
+    Returns:
+        list: Event documents that exist; missing ids are skipped
+    """
+    if not event_ids:
+        return []
+    try:
+        return list(events_collection.find({"id": {"$in": list(event_ids)}}, projection))
+    except Exception as e:
+        print(f"Error getting events: {e}")
+        return []
+
+def delete_events(events_collection, event_ids):
+    if not event_ids:
+        return True
+    try:
+        result = events_collection.delete_many({"id": {"$in": list(event_ids)}})
+        print(f"Deleted {result.deleted_count} events")
+        return True
+    except Exception as e:
+        print(f"Error deleting events: {e}")
+        return False
+
 def clear_events(events_collection, bill_id):
     try:
-        result = events_collection.delete_many({"bill_id": bill_id})
+        result = events_collection.delete_many({"bill.id": bill_id})
         print(f"Deleted {result.deleted_count} events for bill {bill_id}")
         return True
     except Exception as e:
@@ -131,9 +355,180 @@ def clear_events(events_collection, bill_id):
 
 def update_events(events_collection, bill_id, data):
     try:
-        result = events_collection.update_many({"bill_id": bill_id}, {"$set": data})
+        result = events_collection.update_many({"bill.id": bill_id}, {"$set": data})
         print(f"Updated {result.modified_count} events for bill {bill_id}")
         return True
     except Exception as e:
         print(f"Error updating events for bill {bill_id}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def get_cached_extractions(cache_collection, keys):
+    """
+    Look up cached extraction results.
+
+    Args:
+        cache_collection: MongoDB collection instance
+        keys (list): Extraction cache keys
+
+    Returns:
+        dict: Parsed event lists keyed by cache key; misses are absent
+    """
+    if not keys:
+        return {}
+    try:
+        return {entry["_id"]: entry["events"] for entry in cache_collection.find({"_id": {"$in": list(set(keys))}})}
+    except Exception as e:
+        print(f"Error reading extraction cache: {e}")
+        return {}
+
+
+def cache_extractions(cache_collection, entries):
+    """
+    Store parsed extraction results with one unordered bulk write.
+
+    Args:
+        cache_collection: MongoDB collection instance
+        entries (dict): Parsed event lists keyed by cache key
+    """
+    if not entries:
+        return
+    cached_at = datetime.now(timezone.utc)
+    requests = [UpdateOne({"_id": key}, {"$set": {"events": events, "cached_at": cached_at}}, upsert=True)
+                for key, events in entries.items()]
+    try:
+        cache_collection.bulk_write(requests, ordered=False)
+        print(f"Cached {len(entries)} extraction results")
+    except Exception as e:
+        print(f"Error writing extraction cache: {e}")
+
+
+def record_batch(batches_collection, batch_id, bill_ids, attempts=3, **info):
+    """
+    Register a submitted extraction batch for the batch poller. The poller is the only
+    thing that ever checks a batch, so a batch that is not recorded never gets its
+    events stored: the insert is retried and a final failure is raised.
+
+    Args:
+        batches_collection: MongoDB collection instance
+        batch_id (str): Message batch ID
+        bill_ids (list): Bills with requests in the batch
+        attempts (int): Insert attempts before giving up
+        **info: Other fields to store, e.g. request_count
+
+    Raises:
+        Exception: The last insert error, if the batch could not be recorded
+    """
+    now = datetime.now(timezone.utc)
+    for attempt in range(attempts):
+        try:
+            batches_collection.insert_one({
+                "_id": batch_id,
+                "bill_ids": bill_ids,
+                "status": "pending",
+                "created_at": now,
+                "next_check_at": now,
+                "checks": 0,
+                **info
+            })
+            return
+        except DuplicateKeyError:
+            # An earlier attempt was written but its acknowledgement was lost
+            return
+        except Exception as e:
+            print(f"Error recording batch {batch_id} (attempt {attempt + 1} of {attempts}): {e}")
+            if attempt + 1 == attempts:
+                raise
+            time.sleep(2 ** attempt)
+
+
+def get_batch(batches_collection, batch_id):
+    try:
+        return batches_collection.find_one({"_id": batch_id})
+    except Exception as e:
+        print(f"Error getting batch {batch_id}: {e}")
+        return None
+
+
+def add_stored_bills(batches_collection, batch_id, bill_ids):
+    """Add bills whose events were stored to a batch's stored_bill_ids."""
+    if not bill_ids:
+        return True
+    try:
+        batches_collection.update_one({"_id": batch_id}, {"$addToSet": {"stored_bill_ids": {"$each": list(bill_ids)}}})
+        return True
+    except Exception as e:
+        print(f"Error recording stored bills of batch {batch_id}: {e}")
+        return False
+
+
+def get_due_batches(batches_collection, now, limit=50):
+    """
+    Returns:
+        list: Pending batches whose next check is due, most overdue first
+    """
+    try:
+        return list(batches_collection.find(
+            {"status": "pending", "next_check_at": {"$lte": now}},
+            {"bill_ids": 0, "stored_bill_ids": 0, "chunk_counts": 0}
+        ).sort("next_check_at", 1).limit(limit))
+    except Exception as e:
+        print(f"Error getting due batches: {e}")
+        return []
+
+
+def claim_batch(batches_collection, batch_id, now, lease_until):
+    """
+    Atomically take a due batch so overlapping pollers never process it twice. The
+    claim lapses at lease_until if the poller dies before rescheduling the batch.
+
+    Returns:
+        dict or None: The claimed batch, or None if it was not due anymore
+    """
+    try:
+        return batches_collection.find_one_and_update(
+            {"_id": batch_id, "status": "pending", "next_check_at": {"$lte": now}},
+            {"$set": {"next_check_at": lease_until}}
+        )
+    except Exception as e:
+        print(f"Error claiming batch {batch_id}: {e}")
+        return None
+
+
+def update_batch(batches_collection, batch_id, data):
+    try:
+        batches_collection.update_one({"_id": batch_id}, {"$set": data})
+        return True
+    except Exception as e:
+        print(f"Error updating batch {batch_id}: {e}")
+        return False
+
+
+def get_planned_pages(runs_collection, run_id):
+    """
+    Returns:
+        set or None: Listing offsets already enqueued by a scraper planner run, None if
+        they could not be read
+    """
+    try:
+        run = runs_collection.find_one({"_id": run_id}, {"offsets": 1})
+        return set(run.get("offsets", [])) if run else set()
+    except Exception as e:
+        print(f"Error getting scraper run {run_id}: {e}")
+        return None
+
+
+def record_planned_pages(runs_collection, run_id, offsets):
+    """Add listing offsets to those enqueued by a scraper planner run."""
+    if not offsets:
+        return True
+    try:
+        runs_collection.update_one(
+            {"_id": run_id},
+            {"$addToSet": {"offsets": {"$each": list(offsets)}}, "$setOnInsert": {"created_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        return True
+    except Exception as e:
+        print(f"Error recording pages of scraper run {run_id}: {e}")
+        return False
@@ -0,0 +1,116 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# Indexes every deployment needs, by collection. Lookups by bill_id (get_bill,
+# get_bills, update_bill, upsert_bills, clear_events, update_events) and by event id
+# (get_events, delete_events) are collection scans without them.
+REQUIRED_INDEXES = {
+    "bills": [
+        {"name": "bill_id_unique", "keys": [("bill_id", ASCENDING)], "unique": True},
+        {"name": "latest_action_date", "keys": [("latest_action_date", DESCENDING)]},
+    ],
+    "events": [
+        {"name": "id_unique", "keys": [("id", ASCENDING)], "unique": True},
+        # Events carry their bill as an embedded document (see event_retriever.process_event)
+        {"name": "bill_id", "keys": [("bill.id", ASCENDING)]},
+    ],
+    # Due batches for the batch poller
+    "extraction_batches": [
+        {"name": "status_next_check_at", "keys": [("status", ASCENDING), ("next_check_at", ASCENDING)]},
+    ],
+}
+
+_ensured = set()
+
+
+def _key(keys):
+    return tuple((field, int(direction)) for field, direction in keys)
+
+
+def _existing(collection):
+    """Existing indexes keyed by their key pattern."""
+    return {_key(index["key"].items()): index for index in collection.list_indexes()}
+
+
+def ensure_indexes(db, required=None):
+    """
+    Create any declared index that does not exist yet. Safe to run repeatedly: existing
+    indexes are matched by key pattern and never dropped or rebuilt.
+
+    Args:
+        db: MongoDB database instance
+        required (dict): Collection name -> index declarations; defaults to REQUIRED_INDEXES
+
+    Returns:
+        dict: Collection name -> names of the indexes created
+    """
+    required = required or REQUIRED_INDEXES
+    created = {}
+    for collection_name, declared in required.items():
+        collection = db[collection_name]
+        existing = _existing(collection)
+
+        models = []
+        for index in declared:
+            current = existing.get(_key(index["keys"]))
+            if current is None:
+                models.append(IndexModel(index["keys"], name=index["name"], unique=index.get("unique", False)))
+            elif bool(current.get("unique")) != index.get("unique", False):
+                print(f"Warning: index {current['name']} on {collection_name} exists with unique={bool(current.get('unique'))}, "
+                      f"expected unique={index.get('unique', False)}; leaving it unchanged")
+
+        if not models:
+            continue
+        try:
+            created[collection_name] = collection.create_indexes(models)
+            print(f"Created indexes on {collection_name}: {created[collection_name]}")
+        except OperationFailure as e:
+            # e.g. duplicate bill_ids block the unique index; the other indexes are unaffected
+            print(f"Error creating indexes on {collection_name}: {e}")
+    return created
+
+
+def ensure_indexes_once(db):
+    """ensure_indexes on the first connection of a process; later calls do nothing."""
+    if db.name in _ensured:
+        return
+    _ensured.add(db.name)
+    try:
+        ensure_indexes(db)
+    except Exception as e:
+        # Missing indexes only cost speed; never fail the caller over them
+        print(f"Warning: could not ensure indexes on {db.name}: {e}")
+
+
+def index_report(db, required=None):
+    """
+    Compare the indexes of each collection with the declared ones.
+
+    Args:
+        db: MongoDB database instance
+        required (dict): Collection name -> index declarations; defaults to REQUIRED_INDEXES
+
+    Returns:
+        dict: Collection name -> {"missing": declared index names that do not exist,
+        "undeclared": existing index names that are not declared,
+        "unused": existing index names with no recorded use since the server started}
+    """
+    required = required or REQUIRED_INDEXES
+    report = {}
+    for collection_name, declared in required.items():
+        collection = db[collection_name]
+        existing = _existing(collection)
+        declared_keys = {_key(index["keys"]) for index in declared}
+
+        try:
+            usage = {stats["name"]: stats["accesses"]["ops"] for stats in collection.aggregate([{"$indexStats": {}}])}
+        except OperationFailure as e:
+            print(f"Warning: index usage unavailable for {collection_name}: {e}")
+            usage = {}
+
+        report[collection_name] = {
+            "missing": [index["name"] for index in declared if _key(index["keys"]) not in existing],
+            "undeclared": [index["name"] for key, index in existing.items() if key not in declared_keys and index["name"] != "_id_"],
+            "unused": [name for name, ops in usage.items() if ops == 0 and name != "_id_"],
+        }
+    return report
@@ -10,6 +10,8 @@ print(f"Bucket name is {bucket_name}")
 def s3LocationMapping(type, key=''):
     if (type == "requery"):
         return f"requery/{key}"
+    elif (type == "bill_text"):
+        return f"bill_text/{key}"
     else:
         return ""
 
@@ -0,0 +1,147 @@
+import hashlib
+import re
+
+# Section headers of bill text, e.g. "SECTION 1. SHORT TITLE." or "SEC. 101. DEFINITIONS."
+# Upper case only: the table of contents lists sections as "Sec. 101."
+SECTION_HEADER = re.compile(r'\b(?:SECTION|SEC\.) ?(\d+[A-Z]?(?:-\d+)?)\.')
+
+# Division and title headers, e.g. "DIVISION A—" or "TITLE II—"; preferred chunk boundaries
+MAJOR_HEADER = re.compile(r'\b(?:DIVISION [A-Z]{1,2}|TITLE [IVXLC]+) ?[—–-]')
+
+PREAMBLE = "preamble"
+
+
+def split_sections(text):
+    """
+    Split bill text into sections at each section header.
+
+    Args:
+        text (str): Cleaned bill text
+
+    Returns:
+        list: (key, section_text) tuples in document order. Text before the first
+        header is keyed "preamble"; repeated section numbers (e.g. one per
+        division) get a "#n" suffix so keys are unique.
+    """
+    if not text:
+        return []
+
+    sections = []
+    counts = {}
+    start = 0
+    key = PREAMBLE
+    for match in SECTION_HEADER.finditer(text):
+        sections.append((key, text[start:match.start()]))
+
+        label = f"SEC. {match.group(1)}"
+        counts[label] = counts.get(label, 0) + 1
+        key = label if counts[label] == 1 else f"{label}#{counts[label]}"
+        start = match.start()
+
+    sections.append((key, text[start:]))
+    return [(key, section) for key, section in sections if section.strip()]
+
+
+def _normalize(text):
+    # Reflowed, re-hyphenated or re-cased text fingerprints the same
+    return ''.join(text.split()).lower()
+
+
+def fingerprint(section_text):
+    return hashlib.sha256(_normalize(section_text).encode("utf-8")).hexdigest()[:16]
+
+
+def section_hashes(text):
+    """
+    Returns:
+        list: [{"key": ..., "hash": ...}] for every section of text, in document order
+    """
+    return [{"key": key, "hash": fingerprint(section)} for key, section in split_sections(text)]
+
+
+def compare(old_hashes, new_hashes):
+    """
+    Classify sections between two versions of a bill.
+
+    Args:
+        old_hashes (list): section_hashes of the stored text
+        new_hashes (list): section_hashes of the new text
+
+    Returns:
+        dict or None: Lists of section keys under "changed", "added", "removed" and
+        "unchanged", or None when either version has no hashes to compare
+    """
+    if not old_hashes or not new_hashes:
+        return None
+
+    old = {section["key"]: section["hash"] for section in old_hashes}
+    new = {section["key"]: section["hash"] for section in new_hashes}
+    return {
+        "changed": [key for key in new if key in old and old[key] != new[key]],
+        "added": [key for key in new if key not in old],
+        "removed": [key for key in old if key not in new],
+        "unchanged": [key for key in new if key in old and old[key] == new[key]],
+    }
+
+
+def locate(excerpt, sections):
+    """
+    Find the section containing an excerpt, ignoring whitespace and case.
+
+    Args:
+        excerpt (str): Text quoted from the bill
+        sections (list): split_sections output
+
+    Returns:
+        str or None: Key of the first section containing the excerpt
+    """
+    needle = _normalize(excerpt or "")
+    if not needle:
+        return None
+    for key, section in sections:
+        if needle in _normalize(section):
+            return key
+    return None
+
+
+def chunk_text(text, max_chars):
+    """
+    Split text into chunks of at most max_chars, cutting only at section headers
+    where possible. A new chunk starts at a division or title header once the current
+    chunk is half full; a single section longer than max_chars is cut at sentence ends.
+
+    Args:
+        text (str): Cleaned bill text
+        max_chars (int): Chunk size limit
+
+    Returns:
+        list: Chunks in document order; [text] when it already fits
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    majors = {match.start() for match in MAJOR_HEADER.finditer(text)}
+    starts = sorted({0} | majors | {match.start() for match in SECTION_HEADER.finditer(text)})
+    units = zip(starts, starts[1:] + [len(text)])
+
+    chunks = []
+    chunk_start = chunk_end = 0
+    for start, end in units:
+        if chunk_end > chunk_start and (end - chunk_start > max_chars or
+                                        (start in majors and chunk_end - chunk_start > max_chars // 2)):
+            chunks.append(text[chunk_start:chunk_end])
+            chunk_start = start
+        chunk_end = end
+
+        while chunk_end - chunk_start > max_chars:
+            limit = chunk_start + max_chars
+            cut = text.rfind('. ', chunk_start, limit) + 1
+            if cut <= chunk_start + max_chars // 2:
+                cut = text.rfind(' ', chunk_start, limit)
+            if cut <= chunk_start:
+                cut = limit
+            chunks.append(text[chunk_start:cut])
+            chunk_start = cut
+
+    chunks.append(text[chunk_start:chunk_end])
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
@@ -1,15 +1,13 @@
 import os
-import boto3
 import json
-
-sqs = boto3.client('sqs')
+import common_utils.clients as clients
 
 NLP_QUEUE_URL = os.getenv("NLP_QUEUE_URL", "")
 SCRAPER_QUEUE_URL = os.getenv("SCRAPER_QUEUE_URL", "")
 
 def send_to_nlp_queue(message):
 
-    response = sqs.send_message(
+    response = clients.aws_client('sqs').send_message(
         QueueUrl=NLP_QUEUE_URL,
         MessageBody=json.dumps(message)
     )
@@ -21,7 +19,7 @@ def send_to_nlp_queue(message):
 
 def send_to_scraper_queue(message):
     
-    response = sqs.send_message(
+    response = clients.aws_client('sqs').send_message(
         QueueUrl=SCRAPER_QUEUE_URL,
         MessageBody=json.dumps(message)
     )
@@ -29,4 +27,36 @@ def send_to_scraper_queue(message):
     if response.get('MessageId'):
         print(f"Message sent to scraper queue with ID: {response['MessageId']}")
     else:
-        print("Failed to send message to scraper queue.")
\ No newline at end of file
+        print("Failed to send message to scraper queue.")
+
+MAX_BATCH_SIZE = 10  # SendMessageBatch limit
+
+def _send_batch(queue_url, messages, queue_name, attempts=3):
+    """
+    Send messages with SendMessageBatch, retrying entries SQS reports as failed.
+
+    Returns:
+        list: Messages that could not be sent
+    """
+    pending = list(messages)
+    for attempt in range(attempts):
+        failed = []
+        for start in range(0, len(pending), MAX_BATCH_SIZE):
+            chunk = pending[start:start + MAX_BATCH_SIZE]
+            response = clients.aws_client('sqs').send_message_batch(
+                QueueUrl=queue_url,
+                Entries=[{'Id': str(i), 'MessageBody': json.dumps(message)} for i, message in enumerate(chunk)]
+            )
+            for failure in response.get('Failed', []):
+                print(f"Failed to send message to {queue_name} queue (attempt {attempt + 1}): {failure.get('Message')}")
+                failed.append(chunk[int(failure['Id'])])
+
+        print(f"Sent {len(pending) - len(failed)}/{len(pending)} messages to {queue_name} queue")
+        if not failed:
+            return []
+        pending = failed
+
+    return pending
+
+def send_batch_to_scraper_queue(messages):
+    return _send_batch(SCRAPER_QUEUE_URL, messages, "scraper")
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import threading
+import zlib
+import common_utils.clients as clients
+
+try:
+    import zstandard
+except ImportError:  # zlib is always available; zstd is smaller and much faster to decompress
+    zstandard = None
+
+
+# Constants
+ZSTD_LEVEL = int(os.getenv("BILL_TEXT_ZSTD_LEVEL", 10))
+ZLIB_LEVEL = 9
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def compress(text):
+    """
+    Returns:
+        tuple: (codec name, compressed bytes)
+    """
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(codec, data):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Bill text is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown bill text codec: {codec}")
+
+
+class MongoTextBackend:
+    """Side collection next to the bills, so the bills collection only holds pointers."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def put(self, key, data):
+        self.collection.replace_one({"_id": key}, {"data": data}, upsert=True)
+
+    def get(self, key):
+        doc = self.collection.find_one({"_id": key})
+        if doc is None:
+            raise KeyError(key)
+        return bytes(doc["data"])
+
+
+class S3TextBackend:
+    def __init__(self, bucket):
+        # Imported here: common_utils.s3 imports boto3, which readers of inline or Mongo
+        # text never need
+        import common_utils.s3 as s3
+
+        self.bucket = bucket
+        self.s3 = clients.aws_client("s3")
+        self.location = lambda key: s3.s3LocationMapping("bill_text", key)
+
+    def put(self, key, data):
+        self.s3.put_object(Bucket=self.bucket, Key=self.location(key), Body=data)
+
+    def get(self, key):
+        response = self.s3.get_object(Bucket=self.bucket, Key=self.location(key))
+        return response["Body"].read()
+
+
+class LocalTextBackend:
+    """Local disk stand-in for development and backfills."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def put(self, key, data):
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+    def get(self, key):
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+
+def _create_backend(kind, location):
+    if kind == "mongo":
+        return MongoTextBackend(clients.mongo_db()[location])
+    if kind == "s3":
+        return S3TextBackend(location)
+    if kind == "local":
+        return LocalTextBackend(location)
+    raise ValueError(f"Unknown bill text store: {kind}")
+
+
+def _get_backend(kind, location):
+    # Refs record where their text lives, so any backend may be needed to read
+    with _backends_lock:
+        if (kind, location) not in _backends:
+            _backends[(kind, location)] = _create_backend(kind, location)
+        return _backends[(kind, location)]
+
+
+def configured_store():
+    """
+    The (kind, location) selected by BILL_TEXT_STORE for new writes:
+    mongo[:collection], s3[:bucket] or local[:directory]. None keeps text inline.
+    """
+    mode = os.getenv("BILL_TEXT_STORE", "")
+    if not mode:
+        return None
+
+    kind, _, location = mode.partition(":")
+    defaults = {"mongo": "bill_texts", "s3": os.getenv("BUCKET_NAME"), "local": "bill_texts"}
+    if kind not in defaults:
+        raise ValueError(f"Unknown bill text store: {mode}")
+    return kind, location or defaults[kind]
+
+
+def put_text(bill_id, text, store=None):
+    """
+    Compress text and write it to the text store.
+
+    Args:
+        bill_id (str): Bill the text belongs to; one text is kept per bill
+        text (str): The bill text
+        store (tuple): (kind, location); defaults to configured_store()
+
+    Returns:
+        dict: text_ref to keep on the bill document instead of the text
+    """
+    kind, location = store or configured_store()
+    codec, data = compress(text)
+    _get_backend(kind, location).put(bill_id, data)
+    return {
+        "store": kind,
+        "location": location,
+        "key": bill_id,
+        "codec": codec,
+        "length": len(text),
+        "compressed_length": len(data),
+        "hash": hashlib.sha256(text.encode("utf-8")).hexdigest()
+    }
+
+
+def get_text(text_ref):
+    """Read and decompress the text a text_ref points to."""
+    data = _get_backend(text_ref["store"], text_ref["location"]).get(text_ref["key"])
+    return decompress(text_ref["codec"], data)
+
+
+def externalize(bill_data):
+    """
+    Move bill_data['text'] to the configured text store, replacing it with a text_ref.
+    Does nothing when text is stored inline or bill_data has no text.
+
+    Returns:
+        dict: bill_data
+    """
+    store = configured_store()
+    if store is None or not bill_data.get("text"):
+        return bill_data
+
+    bill_data["text_ref"] = put_text(bill_data["bill_id"], bill_data.pop("text"), store)
+    return bill_data
+
+
+def load_text(bill):
+    """
+    Text of a stored bill, decompressed from the text store on first access when it is
+    stored out of line. The result is cached on the bill dict.
+    """
+    if bill.get("text") is None and bill.get("text_ref"):
+        bill["text"] = get_text(bill["text_ref"])
+    return bill.get("text") or ""
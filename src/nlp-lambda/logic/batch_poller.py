@@ -0,0 +1,117 @@
+# Invoked on a schedule. Checks every registered extraction batch that is due and hands
+# ended batches to the event retriever; replaces one EventBridge rule per batch.
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import common_utils.clients as clients
+import common_utils.database as database
+import logic.event_retriever as event_retriever
+
+# Constants
+MIN_POLL_INTERVAL = int(os.getenv("BATCH_POLL_MIN_SECONDS", 120))  # the poller's own schedule
+MAX_POLL_INTERVAL = int(os.getenv("BATCH_POLL_MAX_SECONDS", 1800))
+POLL_BACKOFF = 0.25  # wait this fraction of a batch's age before checking it again
+NEARLY_DONE = 0.1  # check at MIN_POLL_INTERVAL once fewer requests than this fraction are processing
+LEASE_SECONDS = 900  # Lambda timeout; a crashed poll releases its batch after this
+MAX_BATCHES_PER_POLL = 50
+POLL_WORKERS = int(os.getenv("BATCH_POLL_WORKERS", 4))
+# A batch still not processed after this many checks, or this long after it expired, is
+# given up on: e.g. its results can no longer be fetched or never process without error
+MAX_CHECKS = int(os.getenv("BATCH_POLL_MAX_CHECKS", 200))
+EXPIRY_GRACE = timedelta(hours=6)
+BATCH_LIFETIME = timedelta(hours=24)  # processing window of a batch, for batches recorded without expires_at
+
+# process_batch_results statuses after which a batch is never checked again
+FINAL_STATUSES = ('completed', 'expired', 'cancelled', 'errored')
+
+
+def _utc(timestamp):
+    # pymongo returns naive datetimes in UTC
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+
+def next_check_delay(batch, result, now):
+    """
+    Seconds until a batch that has not ended is checked again. Young batches are checked
+    often and old ones back off, except when almost all of their requests are done.
+    """
+    age = (now - _utc(batch['created_at'])).total_seconds()
+    delay = min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, age * POLL_BACKOFF))
+
+    processing = result.get('processing')
+    total = (result.get('processing') or 0) + (result.get('succeeded') or 0) + (result.get('errored') or 0)
+    if processing is not None and total and processing / total < NEARLY_DONE:
+        delay = MIN_POLL_INTERVAL
+    return delay
+
+
+def poll_batch(batch_id, now):
+    """
+    Check one due batch, if no other poller has claimed it.
+
+    Returns:
+        str or None: The batch status after the check, None if it was not claimed
+    """
+    batches_collection = clients.extraction_batches_collection()
+    batch = database.claim_batch(batches_collection, batch_id, now, now + timedelta(seconds=LEASE_SECONDS))
+    if not batch:
+        return None
+
+    result = event_retriever.main(batch_id, batch['bill_ids'], legacy_rule=False, record=batch)
+    status = result.get('status')
+
+    checked_at = datetime.now(timezone.utc)
+    if status in FINAL_STATUSES:
+        database.update_batch(batches_collection, batch_id, {
+            'status': status,
+            'finished_at': checked_at,
+            'checks': batch.get('checks', 0) + 1
+        })
+        return status
+
+    # not_ready, or the check itself failed
+    expires_at = _utc(batch['expires_at']) if batch.get('expires_at') else _utc(batch['created_at']) + BATCH_LIFETIME
+    if batch.get('checks', 0) + 1 >= MAX_CHECKS or checked_at > expires_at + EXPIRY_GRACE:
+        print(f"Error: giving up on batch {batch_id} after {batch.get('checks', 0) + 1} checks (last status {status}), retrying its bills")
+        database.update_batch(batches_collection, batch_id, {
+            'status': 'failed',
+            'finished_at': checked_at,
+            'checks': batch.get('checks', 0) + 1,
+            'last_status': status
+        })
+        stored = set(batch.get('stored_bill_ids', []))
+        event_retriever.retry_extraction([bill_id for bill_id in batch['bill_ids'] if bill_id not in stored])
+        return 'failed'
+
+    delay = next_check_delay(batch, result, checked_at)
+    database.update_batch(batches_collection, batch_id, {
+        'next_check_at': checked_at + timedelta(seconds=delay),
+        'checks': batch.get('checks', 0) + 1,
+        'last_status': status
+    })
+    print(f"Batch {batch_id} {status}, next check in {delay:.0f}s")
+    return status
+
+
+def main():
+    now = datetime.now(timezone.utc)
+    due = database.get_due_batches(clients.extraction_batches_collection(), now, limit=MAX_BATCHES_PER_POLL)
+    if not due:
+        print("No batches due")
+        return {}
+
+    print(f"Checking {len(due)} due batches")
+    batch_ids = [batch['_id'] for batch in due]
+    with ThreadPoolExecutor(max_workers=min(POLL_WORKERS, len(batch_ids))) as executor:
+        statuses = dict(zip(batch_ids, executor.map(lambda batch_id: poll_batch(batch_id, now), batch_ids)))
+
+    summary = {}
+    for status in statuses.values():
+        summary[status or 'claimed_elsewhere'] = summary.get(status or 'claimed_elsewhere', 0) + 1
+    print(f"Batch poll complete: {summary}")
+    return summary
+
+
+def handler(payload):
+    """Handle scheduled batch polls"""
+    return main()
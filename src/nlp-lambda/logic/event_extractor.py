@@ -1,126 +1,227 @@
 # Invoked with a list of bill events. Extracts key events from bills using batch processing, processes and stores in database
-import boto3
+import hashlib
 import os
 import json
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
+from concurrent.futures import ThreadPoolExecutor
+import common_utils.clients as clients
 import common_utils.database as database
-import anthropic
-from anthropic.types.message_create_params import MessageCreateParamsNonStreaming
-from anthropic.types.messages.batch_create_params import Request
+import common_utils.sections as sections
+import common_utils.text_store as text_store
 
-ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
-anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+# Constants
+CHUNK_TOKENS = int(os.getenv("EXTRACTION_CHUNK_TOKENS", 20000))  # bill text per request
+CHARS_PER_TOKEN = 4
+CHUNK_SEPARATOR = "__"  # custom_id of chunk i of a bill is f"{bill_id}__{i}__{cache key}"
+CACHE_KEY_LENGTH = 24  # hex digits; custom_id is limited to 64 characters
+SMALL_MODEL = "claude-3-5-haiku-latest"
+LARGE_MODEL = "claude-sonnet-4-20250514"
+SMALL_MODEL_MAX_CHARS = 10000  # chunks at least this long go to LARGE_MODEL
 
-uri = os.environ.get("DB_URI")
+# Batch packing. The API allows 100,000 requests or 256 MB per batch; smaller batches
+# finish sooner and a rejected one takes fewer bills with it.
+MAX_BATCH_REQUESTS = int(os.getenv("MAX_BATCH_REQUESTS", 5000))
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", 64 * 1024 * 1024))
+SUBMIT_WORKERS = int(os.getenv("BATCH_SUBMIT_WORKERS", 4))  # batches created concurrently
+BILL_PAGE_SIZE = 100  # bills read from Mongo and checked against the cache at a time
 
-client = MongoClient(uri, server_api=ServerApi('1'))
-db = client['auxiom_database']
-bills_collection = db['bills']
-events_collection = db['events']
+SYSTEM_PROMPT = "You are an expert legislative analyst. Your task is to extract policy events from the text of a U.S. legislative bill.\n\nDefinition of an event:\n- A substantive policy changes that affect how government programs, funding, or regulations operate.\n- Multiple sentences of bill text that constitutes a change in policy for one or more topics. Include all related sentences in the bill.\n- Include enough context to determine what the change is and what it applies to.\n- All details related to the event should be encapsulated in the text excerpt.\n\nExtraction Procedure\n- The goal is to maximize the number of events extracted and minimize noise (negligible events).\n- Collect all events that have unique results in the bill. Merge events that are related to the same result.\n- Prune events that are simply minor, technical, or procedural details of the bill (such as budget scoring rules, effective dates, definitions, or clerical amendments).\n- There is no minimum or maximum number of events. Be sure all events meet the requirements outlined. Return an empty array if there is no event that meets the guidelines above. \n- Only output valid JSON as a list of objects (no commentary, no explanation).\n\nFor each event, return a JSON object in the following format:\n\nJSON\n{\n\"text\": \"<exact excerpt of bill text describing the policy change>\",\n\"topics\": [\"<broad policy areas impacted>\"],\n\"tags\": [\"<specific descriptors within the topics>\"],\n\"summary\": \"<analysis of text contextualizing the main idea of the event in the goal of the bill>\",\n\"title\": \"<concise descriptor of event>\"\n}\n\nGuidelines:\n- Text is excerpt of bill text that constitutes a change in policy and all related details. Include any other excerpts of text from the bill that add valuable context. \n- Topics are broad policy areas where the U.S. government takes a stance (e.g., \"Healthcare\", \"Defense\", \"Education\", \"Energy\", \"Immigration\"). Topics are one word.\n- Tags are narrower descriptors that specify the scope within a topic (e.g., for Healthcare → \"Medicare\", \"drug pricing\"; for Energy → \"renewable energy\", \"oil subsidies\"). Tags should be just one level more specific than the topic, but still broad.\n- Summary is a summary of the bill's overall goal, specifying what the event achieves. Define any unknown entities. Include all information in the bill outside of the event that contextualizes the event.\n- Title is a short, concise, and specific descriptor with metrics included when possible.\n\nExample output:\n\n[\n    {\n        \"text\": \"Notwithstanding any other provision of law, the Secretary of Health and Human Services shall, beginning on January 1, 2026, negotiate directly with manufacturers of insulin products with respect to the prices that may be charged to prescription drug plans under part D of title XVIII of the Social Security Act for such products furnished to individuals entitled to benefits under such title.\",\n        \"topics\": [\"Healthcare\"],\n        \"tags\": [\"Medicare\", \"drug pricing\", \"insulin\"],\n        \"summary\": \"The Secretary of Health and Human Services will negotiate the price of insulin for Medicare beneficiaries.\",\n        \"title\": \"Insulin Prices to be Negotiated\"\n    },\n    {\n        \"text\": \"Of the amounts authorized to be appropriated for the Department of Defense for fiscal year 2026, the Secretary of Defense shall allocate not less than $500,000,000 for the purposes of planning, developing, and sustaining cybersecurity infrastructure, including but not limited to network modernization, threat detection systems, and defensive cyber operations.\",\n        \"topics\": [\"Defense\", \"Technology\"],\n        \"tags\": [\"cybersecurity\", \"infrastructure funding\"],\n        \"summary\": \"The Department of Defense allocates $500 million for cybersecurity infrastructure.\",\n        \"title\": \"$500M allocated for cybersecurity\"\n    }\n]"
 
-# AWS clients
-events_client = boto3.client('events')
+RESPONSE_FORMAT = "Structure your response as a list of JSONs with the following keys: text (string), topics (list), tags (list), summary(string), title (string). Only include this list, no comments or introduction.\n\n"
+
+# Cached extractions are only reused for the same prompt
+PROMPT_VERSION = hashlib.sha256((SYSTEM_PROMPT + RESPONSE_FORMAT).encode("utf-8")).hexdigest()[:12]
+
+
+def cache_key(model, chunk):
+    """Extraction cache key of a request: prompt version, model and whitespace-normalized text."""
+    normalized = ' '.join(chunk.split())
+    return hashlib.sha256(f"{PROMPT_VERSION}\n{model}\n{normalized}".encode("utf-8")).hexdigest()[:CACHE_KEY_LENGTH]
+
+
+def parse_custom_id(custom_id):
+    """
+    Returns:
+        tuple: (bill_id, cache key or None). Requests submitted before chunking or
+        caching have custom_id bill_id or f"{bill_id}__{i}".
+    """
+    parts = custom_id.split(CHUNK_SEPARATOR)
+    return parts[0], parts[2] if len(parts) > 2 else None
 
 
 def create_batch_requests(bills):
+    from anthropic.types.message_create_params import MessageCreateParamsNonStreaming
+    from anthropic.types.messages.batch_create_params import Request
 
     requests = []
     
     for bill in bills:
-        if len(bill.get('text')) < 10000:
-            model = "claude-3-5-haiku-latest"
-            max_tokens=8192
-        else:
-            model = "claude-sonnet-4-20250514"
-            max_tokens=12000
+        # Oversized bills are split at section boundaries so no request overflows the
+        # context or max_tokens; the retriever merges the events of all chunks
+        chunks = sections.chunk_text(text_store.load_text(bill), CHUNK_TOKENS * CHARS_PER_TOKEN)
+        for i, chunk in enumerate(chunks):
+            part = f" (part {i + 1} of {len(chunks)})" if len(chunks) > 1 else ""
+            if len(chunk) < SMALL_MODEL_MAX_CHARS:
+                model = SMALL_MODEL
+                max_tokens=8192
+            else:
+                model = LARGE_MODEL
+                max_tokens=12000
+            custom_id = CHUNK_SEPARATOR.join([bill['bill_id'], str(i), cache_key(model, chunk)])
     
-        request = Request(
-            custom_id=bill['bill_id'],
-            params=MessageCreateParamsNonStreaming(
-                model=model,
-                max_tokens=max_tokens,
-                temperature=0.7,
-                system="You are an expert legislative analyst. Your task is to extract policy events from the text of a U.S. legislative bill.\n\nDefinition of an event:\n- A substantive policy changes that affect how government programs, funding, or regulations operate.\n- Multiple sentences of bill text that constitutes a change in policy for one or more topics. Include all related sentences in the bill.\n- Include enough context to determine what the change is and what it applies to.\n- All details related to the event should be encapsulated in the text excerpt.\n\nExtraction Procedure\n- The goal is to maximize the number of events extracted and minimize noise (negligible events).\n- Collect all events that have unique results in the bill. Merge events that are related to the same result.\n- Prune events that are simply minor, technical, or procedural details of the bill (such as budget scoring rules, effective dates, definitions, or clerical amendments).\n- There is no minimum or maximum number of events. Be sure all events meet the requirements outlined. Return an empty array if there is no event that meets the guidelines above. \n- Only output valid JSON as a list of objects (no commentary, no explanation).\n\nFor each event, return a JSON object in the following format:\n\nJSON\n{\n\"text\": \"<exact excerpt of bill text describing the policy change>\",\n\"topics\": [\"<broad policy areas impacted>\"],\n\"tags\": [\"<specific descriptors within the topics>\"],\n\"summary\": \"<analysis of text contextualizing the main idea of the event in the goal of the bill>\",\n\"title\": \"<concise descriptor of event>\"\n}\n\nGuidelines:\n- Text is excerpt of bill text that constitutes a change in policy and all related details. Include any other excerpts of text from the bill that add valuable context. \n- Topics are broad policy areas where the U.S. government takes a stance (e.g., \"Healthcare\", \"Defense\", \"Education\", \"Energy\", \"Immigration\"). Topics are one word.\n- Tags are narrower descriptors that specify the scope within a topic (e.g., for Healthcare → \"Medicare\", \"drug pricing\"; for Energy → \"renewable energy\", \"oil subsidies\"). Tags should be just one level more specific than the topic, but still broad.\n- Summary is a summary of the bill's overall goal, specifying what the event achieves. Define any unknown entities. Include all information in the bill outside of the event that contextualizes the event.\n- Title is a short, concise, and specific descriptor with metrics included when possible.\n\nExample output:\n\n[\n    {\n        \"text\": \"Notwithstanding any other provision of law, the Secretary of Health and Human Services shall, beginning on January 1, 2026, negotiate directly with manufacturers of insulin products with respect to the prices that may be charged to prescription drug plans under part D of title XVIII of the Social Security Act for such products furnished to individuals entitled to benefits under such title.\",\n        \"topics\": [\"Healthcare\"],\n        \"tags\": [\"Medicare\", \"drug pricing\", \"insulin\"],\n        \"summary\": \"The Secretary of Health and Human Services will negotiate the price of insulin for Medicare beneficiaries.\",\n        \"title\": \"Insulin Prices to be Negotiated\"\n    },\n    {\n        \"text\": \"Of the amounts authorized to be appropriated for the Department of Defense for fiscal year 2026, the Secretary of Defense shall allocate not less than $500,000,000 for the purposes of planning, developing, and sustaining cybersecurity infrastructure, including but not limited to network modernization, threat detection systems, and defensive cyber operations.\",\n        \"topics\": [\"Defense\", \"Technology\"],\n        \"tags\": [\"cybersecurity\", \"infrastructure funding\"],\n        \"summary\": \"The Department of Defense allocates $500 million for cybersecurity infrastructure.\",\n        \"title\": \"$500M allocated for cybersecurity\"\n    }\n]",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"Bill text to analyze:\n{bill.get('text')}\nStructure your response as a list of JSONs with the following keys: text (string), topics (list), tags (list), summary(string), title (string). Only include this list, no comments or introduction.\n\n"
-                            }
-                        ]
-                    },
-                    {
-                        "role": "assistant",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "["
-                            }
-                        ]
-                    }
-                ]
+            request = Request(
+                custom_id=custom_id,
+                params=MessageCreateParamsNonStreaming(
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=0.7,
+                    system=SYSTEM_PROMPT,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": f"Bill text to analyze{part}:\n{chunk}\n{RESPONSE_FORMAT}"
+                                }
+                            ]
+                        },
+                        {
+                            "role": "assistant",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": "["
+                                }
+                            ]
+                        }
+                    ]
+                )
             )
-        )
-        requests.append(request)
+            requests.append(request)
     
     return requests
 
-def create_eventbridge_rule(batch_id, bill_ids):
+def serve_cached_extractions(bills, requests):
     """
-    Create EventBridge rules with backoff strategy to check batch status.
-    Creates multiple rules with different schedules and automatic cleanup.
+    Store the events of bills whose every request has a cached extraction, without a
+    batch. Bills with only some cached requests submit the rest; the retriever merges
+    in the cached ones listed in their cached_chunks.
+
+    Returns:
+        tuple: (bills to submit, requests to submit)
     """
-    
-    # Create the rule
-    events_client.put_rule(
-        Name=f'batch-check-{batch_id}',
-        ScheduleExpression=f"rate(2 minutes)",
-        Description=f"Check batch {batch_id} status every 2 minutes",
-        State='ENABLED'
-    )
-    
-    # Create the target (SQS queue message)
-    message_payload = {
-        "action": "e_event_retriever",
-        "payload": {
-            "batch_id": batch_id,
-            "bill_ids": bill_ids
-        }
-    }
-    
-    # Add target to the rule - send message to nlp queue via SQS utils
-    events_client.put_targets(
-        Rule=f'batch-check-{batch_id}',
-        Targets=[
-            {
-                'Id': f'nlp-queue-target-{batch_id}',
-                'Arn': os.environ.get('NLP_QUEUE_ARN'),
-                'Input': json.dumps(message_payload)
-            }
-        ]
-    )
+    keys_by_bill = {}
+    for request in requests:
+        bill_id, key = parse_custom_id(request['custom_id'])
+        keys_by_bill.setdefault(bill_id, []).append(key)
+    cached = database.get_cached_extractions(clients.extraction_cache_collection(), [key for keys in keys_by_bill.values() for key in keys])
+
+    submit_bills = []
+    served = []
+    for bill in bills:
+        bill_id = bill['bill_id']
+        keys = keys_by_bill.get(bill_id, [])
+        hits = [key for key in keys if key in cached]
+
+        if keys and len(hits) == len(keys):
+            print(f"Serving {bill_id} from the extraction cache ({len(keys)} requests)")
+            served.append((bill_id, [event for key in keys for event in cached[key]], []))
+            continue
+
+        if hits or bill.get('cached_chunks'):
+            database.update_bill(clients.bills_collection(), {'bill_id': bill_id, 'cached_chunks': hits or None})
+        submit_bills.append(bill)
+
+    submit_ids = {bill['bill_id'] for bill in submit_bills}
+    submit_requests = []
+    for request in requests:
+        bill_id, key = parse_custom_id(request['custom_id'])
+        if bill_id in submit_ids and key not in cached:
+            submit_requests.append(request)
+
+    if served:
+        # Imported here: the retriever imports this module
+        import logic.event_retriever as event_retriever
+
+        # One bill query, embedding stage and bulk write for the whole page
+        results = event_retriever.store_bills_events(served)
+        failed = [result['bill_id'] for result in results if result['status'] not in ('success', 'partial', 'bill_not_found')]
+        if failed:
+            print(f"Could not store {len(failed)} bills served from the extraction cache, retrying them")
+            event_retriever.retry_extraction(failed)
 
+    if cached:
+        print(f"Extraction cache: {len(requests) - len(submit_requests)} of {len(requests)} requests served, "
+              f"{len(bills) - len(submit_bills)} of {len(bills)} bills complete")
+    return submit_bills, submit_requests
 
-def submit_batch_for_processing(bills):
+
+class BatchPacker:
+    """
+    Packs the requests of whole bills into batches, one open batch per model tier, and
+    closes a batch before it would exceed MAX_BATCH_REQUESTS or MAX_BATCH_BYTES. All
+    chunks of a bill stay in one batch so the retriever sees the bill complete.
+    """
+
+    def __init__(self, max_requests=MAX_BATCH_REQUESTS, max_bytes=MAX_BATCH_BYTES):
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.open = {}
+
+    def add(self, bill_id, requests):
+        """
+        Returns:
+            list: Batches closed to make room, ready to submit
+        """
+        # Bills needing the large model wait longer; keep them out of the fast batches
+        tier = LARGE_MODEL if any(request['params']['model'] == LARGE_MODEL for request in requests) else SMALL_MODEL
+        size = sum(len(json.dumps(request)) for request in requests)
+
+        closed = []
+        batch = self.open.get(tier)
+        if batch and (len(batch['requests']) + len(requests) > self.max_requests or batch['bytes'] + size > self.max_bytes):
+            closed.append(self.open.pop(tier))
+        batch = self.open.setdefault(tier, {'tier': tier, 'bill_ids': [], 'requests': [], 'bytes': 0})
+
+        batch['bill_ids'].append(bill_id)
+        batch['requests'].extend(requests)
+        batch['bytes'] += size
+        return closed
+
+    def flush(self):
+        """Close and return every open batch."""
+        closed = list(self.open.values())
+        self.open = {}
+        return closed
+
+
+def submit_batch_for_processing(bill_ids, requests, tier=None):
     """Submit batch requests to Anthropic and return batch tracking information"""
-    requests = create_batch_requests(bills)
-    
-    print(f"Creating batch with {len(requests)} requests")
+    print(f"Creating batch with {len(requests)} requests for {len(bill_ids)} bills")
     
-    message_batch = anthropic_client.messages.batches.create(requests=requests)
+    message_batch = clients.anthropic_client().messages.batches.create(requests=requests)
     
     print(f"Batch created with ID: {message_batch.id}")
     print(f"Processing status: {message_batch.processing_status}")
     print(f"Request counts: {message_batch.request_counts}")
-    
+
+    # Requests per bill, so the retriever stores each bill as soon as its results are in
+    chunk_counts = {}
+    for request in requests:
+        bill_id = parse_custom_id(request['custom_id'])[0]
+        chunk_counts[bill_id] = chunk_counts.get(bill_id, 0) + 1
+
+    # The batch poller (logic.batch_poller) checks registered batches until they end
     try:
-        ids = [bill['bill_id'] for bill in bills]
-        create_eventbridge_rule(message_batch.id, ids)
-    except Exception as e:
-        print(f"Error creating eventbridge rule: {e}")
+        database.record_batch(clients.extraction_batches_collection(), message_batch.id, bill_ids,
+                              tier=tier, request_count=len(requests), chunk_counts=chunk_counts,
+                              expires_at=message_batch.expires_at)
+    except Exception:
+        # Nothing would ever poll it; cancel it so the bills, re-queued by the caller,
+        # are not extracted twice
+        print(f"Error: batch {message_batch.id} could not be registered, cancelling it")
+        clients.anthropic_client().messages.batches.cancel(message_batch.id)
+        raise
     
     return {
         'batch_id': message_batch.id,
@@ -129,31 +230,180 @@ def submit_batch_for_processing(bills):
         'created_at': message_batch.created_at,
         'expires_at': message_batch.expires_at,
         'results_url': message_batch.results_url,
-        'bill_ids': [bill['bill_id'] for bill in bills]
+        'bill_ids': bill_ids
     }
 
 
-def main(bill_ids):
-    """Process multiple bills using batch API"""
-    bills = []
-    
-    # Get all bills from database
-    for bill_id in bill_ids:
-        bill = database.get_bill(bills_collection, bill_id)
-        if bill:
-            bills.append(bill)
+def pack_bills(bills, packer):
+    """
+    Build the requests of a page of bills, serve what the extraction cache can, and add
+    the rest to packer.
+
+    Returns:
+        list: Batches closed by the packer
+    """
+    requests = create_batch_requests(bills)
+    bills, requests = serve_cached_extractions(bills, requests)
+
+    requests_by_bill = {}
+    for request in requests:
+        requests_by_bill.setdefault(parse_custom_id(request['custom_id'])[0], []).append(request)
+
+    closed = []
+    for bill in bills:
+        closed.extend(packer.add(bill['bill_id'], requests_by_bill[bill['bill_id']]))
+    return closed
+
+
+def prepare_section_update(bill, changed_sections):
+    """
+    Keep the events of a revised bill that lie in unchanged sections and delete the rest,
+    so only changed_sections need to be extracted again.
+
+    Returns:
+        bool: False if an existing event could not be located in the new text, in which
+        case nothing is changed and the whole bill must be re-extracted
+    """
+    bill_id = bill['bill_id']
+    bill_sections = sections.split_sections(text_store.load_text(bill))
+    changed = set(changed_sections)
+
+    kept = []
+    stale = []
+    for event in database.get_events(clients.events_collection(), bill.get('events', []), projection={'id': 1, 'text': 1}):
+        key = sections.locate(event.get('text'), bill_sections)
+        if key is None:
+            print(f"Could not locate event {event['id']} in the text of {bill_id}, re-extracting the whole bill")
+            return False
+        if key in changed:
+            stale.append(event['id'])
         else:
-            print(f"Warning: Bill {bill_id} not found in database")
-    
-    if not bills:
-        raise Exception("No valid bills found for processing")
-    
-    print(f"Processing {len(bills)} bills for batch event extraction")
-    
-    # Submit batch for processing
-    batch_info = submit_batch_for_processing(bills)
-    
-    return batch_info
+            kept.append(event['id'])
+
+    database.delete_events(clients.events_collection(), stale)
+    # pending_sections tells the retriever to add the new events to the kept ones. With
+    # no changed sections (only sections were removed) nothing is extracted, so nothing
+    # would ever clear it
+    database.update_bill(clients.bills_collection(), {
+        'bill_id': bill_id,
+        'events': kept,
+        'pending_sections': list(changed_sections) or None
+    })
+    print(f"Keeping {len(kept)} events of {bill_id}, re-extracting {len(changed_sections)} changed sections")
+    return True
+
+
+def select_sections(bill, section_keys):
+    """Copy of the bill whose text only contains the given sections."""
+    wanted = set(section_keys)
+    text = ' '.join(section for key, section in sections.split_sections(text_store.load_text(bill)) if key in wanted)
+    return dict(bill, text=text)
+
+
+def main(bill_ids, section_targets=None):
+    """
+    Process multiple bills using batch API
+
+    Args:
+        bill_ids (list): Bills to extract events from
+        section_targets (dict): bill_id -> section keys, for bills where only those
+            sections should be extracted
+    """
+    section_targets = section_targets or {}
+    found = set()
+    skipped = 0
+    page = []
+    packer = BatchPacker()
+    futures = []
+    # Bills not handed to a batch because of an error. Batches created before an error
+    # stand, so the message must not fail and be redelivered: only these are re-queued
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=SUBMIT_WORKERS) as executor:
+        def submit(batches):
+            for batch in batches:
+                futures.append((batch, executor.submit(submit_batch_for_processing, batch['bill_ids'], batch['requests'], batch['tier'])))
+
+        def pack(page):
+            try:
+                submit(pack_bills(page, packer))
+            except Exception as e:
+                print(f"Error preparing requests of {len(page)} bills: {e}")
+                failed.extend(bill['bill_id'] for bill in page)
+
+        # Stream bills from the database; full batches are submitted while later bills are still being read
+        read_error = None
+        try:
+            for bill in database.iter_bills(clients.bills_collection(), bill_ids, profile="extraction_input", batch_size=BILL_PAGE_SIZE):
+                bill_id = bill['bill_id']
+                found.add(bill_id)
+
+                if bill_id in section_targets:
+                    try:
+                        bill = select_sections(bill, section_targets[bill_id])
+                    except Exception as e:
+                        print(f"Error selecting changed sections of {bill_id}: {e}")
+                        failed.append(bill_id)
+                        continue
+                    if not bill['text'].strip():
+                        # Only sections without events were removed; the kept events are final
+                        print(f"No changed sections to extract for {bill_id}")
+                        database.update_bill(clients.bills_collection(), {'bill_id': bill_id, 'pending_sections': None})
+                        skipped += 1
+                        continue
+
+                page.append(bill)
+                if len(page) >= BILL_PAGE_SIZE:
+                    pack(page)
+                    page = []
+        except Exception as e:
+            read_error = e
+            print(f"Error reading bills after {len(found)} of {len(bill_ids)}: {e}")
+
+        if page:
+            pack(page)
+        submit(packer.flush())
+
+        batches = []
+        for batch, future in futures:
+            try:
+                batches.append(future.result())
+            except Exception as e:
+                print(f"Error submitting batch of {len(batch['bill_ids'])} bills: {e}")
+                failed.extend(batch['bill_ids'])
+
+    if read_error:
+        # Bills after the failed read were never looked at
+        failed.extend(bill_id for bill_id in bill_ids if bill_id not in found)
+    else:
+        for bill_id in bill_ids:
+            if bill_id not in found:
+                print(f"Warning: Bill {bill_id} not found in database")
+
+        if not found:
+            raise Exception("No valid bills found for processing")
+
+    if failed:
+        # Imported here: the retriever imports this module
+        import logic.event_retriever as event_retriever
+
+        # The other batches were created; only re-queue the bills that did not make it into one
+        try:
+            event_retriever.retry_extraction(failed)
+        except Exception as e:
+            if not batches:
+                raise  # nothing was submitted, so the message can safely be redelivered
+            print(f"Error re-queuing bills {failed}: {e}")
+
+    if not batches:
+        print(f"Nothing to submit: {skipped} bills without changed sections, {len(failed)} bills re-queued, rest served from the extraction cache")
+        return None
+
+    print(f"Submitted {len(batches)} batches for {sum(len(batch['bill_ids']) for batch in batches)} bills")
+    return {
+        'batches': batches,
+        'bill_ids': [bill_id for batch in batches for bill_id in batch['bill_ids']]
+    }
 
 
 def handler(payload):
@@ -163,19 +413,32 @@ def handler(payload):
     bill_ids = payload.get('ids')
     type = payload.get('type', '')
 
+    section_targets = {}
     if type == 'updated_bill':
-        # Clear all events for these bills
+        # Changed section keys per bill from ingest; missing or None means the whole bill
+        changed_sections = payload.get('sections') or {}
+        stored_bills = database.get_bills(clients.bills_collection(), bill_ids, profile="extraction_input")
+
         for bill_id in bill_ids:
-            database.clear_events(events_collection, bill_id)
+            bill = stored_bills.get(bill_id)
+            if bill and changed_sections.get(bill_id) is not None and prepare_section_update(bill, changed_sections[bill_id]):
+                section_targets[bill_id] = changed_sections[bill_id]
+                continue
+
+            # Clear all events for this bill
+            database.clear_events(clients.events_collection(), bill_id)
+            if bill:
+                database.delete_events(clients.events_collection(), bill.get('events', []))
             bill_data = {
                 'bill_id': bill_id,
-                'events': []
+                'events': [],
+                'pending_sections': None
             }
-            database.update_bill(bills_collection, bill_data)
+            database.update_bill(clients.bills_collection(), bill_data)
     
     print(f"Processing batch event extraction for {len(bill_ids)} bills: {bill_ids}")
     
-    batch_info = main(bill_ids)
+    batch_info = main(bill_ids, section_targets)
     return batch_info
 
 
@@ -1,47 +1,91 @@
-from google import genai
 import os
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
+import common_utils.clients as clients
 import common_utils.database as database
 import json
-import numpy as np
+import queue
+import random
+import threading
+import time
 import uuid
-import anthropic
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import boto3
+import common_utils.sections as sections
 import common_utils.sqs as sqs
+import logic.event_extractor as event_extractor
 
+# Constants
+MAX_EXTRACTION_ATTEMPTS = int(os.getenv("MAX_EXTRACTION_ATTEMPTS", 3))  # per bill, including retries
+USAGE_FIELDS = ("input_tokens", "output_tokens")
+EMBEDDING_MODEL = "gemini-embedding-001"
+EMBEDDING_DIMENSIONS = 768
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 100))  # texts per embed_content request (API limit 100)
+EMBED_ATTEMPTS = 3
+EMBED_BACKOFF = 1.0  # seconds, doubled per attempt
+EVENT_INSERT_CHUNK = 500  # events per insert_many; each carries a 768-float embedding
+RESULT_QUEUE_SIZE = int(os.getenv("RESULT_QUEUE_SIZE", 256))  # batch results read ahead of the parse workers
+PARSE_WORKERS = int(os.getenv("RESULT_PARSE_WORKERS", 2))
+STORE_WORKERS = int(os.getenv("RESULT_STORE_WORKERS", 4))  # groups of bills embedded and written concurrently
+STORE_GROUP_BILLS = int(os.getenv("RESULT_STORE_GROUP_BILLS", 50))
 
-GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
-ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
-genai_client = genai.Client(api_key=GOOGLE_API_KEY)
-anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+# store_bills_events statuses of bills whose events were inserted; they are neither
+# retried nor stored again
+STORED_STATUSES = ('success', 'partial', 'database_update_failed')
+
+def event_content(event):
+    """Text embedded for an event, or None if the event lacks topics, tags or summary."""
+    try:
+        return ' '.join(event['topics']) + ' ' + ' '.join(event['tags']) + ' ' + event['summary']
+    except (KeyError, TypeError):
+        return None
 
-uri = os.environ.get("DB_URI")
 
-client = MongoClient(uri, server_api=ServerApi('1'))
-db = client['auxiom_database']
-bills_collection = db['bills']
-events_collection = db['events']
+def embed_contents(contents):
+    """
+    Embed many texts with multi-input requests of up to EMBED_BATCH_SIZE, retrying each
+    request with backoff, and L2-normalize each request's vectors as one matrix.
 
-events_client = boto3.client('events')
+    Args:
+        contents (list): Texts to embed; None entries are skipped
 
-def process_event(bill, event):
-    def _get_embedding(content):
-        result = genai_client.models.embed_content(
-        model="gemini-embedding-001",
-        contents=content,
-        config=genai.types.EmbedContentConfig(output_dimensionality=768))
+    Returns:
+        list: Normalized embedding (list of floats) per text, None where the text was
+        None or its request failed every attempt
+    """
+    # Only needed once a batch has ended; most polls never get here
+    import numpy as np
+    from google.genai import types
 
-        [embedding_obj] = result.embeddings
-        embedding_values_np = np.array(embedding_obj.values)
-        normed_embedding = embedding_values_np / np.linalg.norm(embedding_values_np)
+    embeddings = [None] * len(contents)
+    positions = [i for i, content in enumerate(contents) if content is not None]
+    for start in range(0, len(positions), EMBED_BATCH_SIZE):
+        chunk = positions[start:start + EMBED_BATCH_SIZE]
+        for attempt in range(EMBED_ATTEMPTS):
+            try:
+                result = clients.genai_client().models.embed_content(
+                    model=EMBEDDING_MODEL,
+                    contents=[contents[i] for i in chunk],
+                    config=types.EmbedContentConfig(output_dimensionality=EMBEDDING_DIMENSIONS))
 
-        return normed_embedding.tolist()
+                matrix = np.array([embedding.values for embedding in result.embeddings], dtype=float)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1
+                for i, vector in zip(chunk, (matrix / norms).tolist()):
+                    embeddings[i] = vector
+                break
+            except Exception as e:
+                if attempt == EMBED_ATTEMPTS - 1:
+                    print(f"Error embedding {len(chunk)} events after {EMBED_ATTEMPTS} attempts: {e}")
+                else:
+                    delay = EMBED_BACKOFF * 2 ** attempt + random.uniform(0, EMBED_BACKOFF)
+                    print(f"Embedding request failed ({e}), retrying in {delay:.1f}s")
+                    time.sleep(delay)
+    return embeddings
 
-    content = ' '.join(event['topics']) + ' ' + ' '.join(event['tags']) + ' ' + event['summary']
 
-    event['embedding'] = _get_embedding(content)
+def process_event(bill, event, embedding):
+    if embedding is None:
+        raise ValueError("no embedding: missing topics, tags or summary, or the embedding request failed")
+    event['embedding'] = embedding
 
     actions = bill['actions']
 
@@ -65,11 +109,425 @@ def process_event(bill, event):
 
     return event
 
-def process_batch_results(batch_id):
-    """Process results from a completed batch - to be called separately when batch is done"""
+def parse_events(response_text):
+    """
+    Parse the event list of a response, salvaging the complete events of a response
+    that was cut off at max_tokens.
+
+    Returns:
+        tuple: (events, whether the whole list parsed)
+    """
+    events_json = '[' + response_text  # Add opening bracket from prefill
+    try:
+        return json.loads(events_json), True
+    except json.JSONDecodeError:
+        pass
+
+    decoder = json.JSONDecoder()
+    events = []
+    position = 1
+    while True:
+        while position < len(events_json) and events_json[position] in ' \t\r\n,':
+            position += 1
+        try:
+            event, position = decoder.raw_decode(events_json, position)
+        except json.JSONDecodeError:
+            break
+        if isinstance(event, dict):
+            events.append(event)
+
+    if not events:
+        # Nothing usable; raise the original error
+        json.loads(events_json)
+    return events, False
+
+
+def merge_events(events):
+    """
+    Events of all chunks of a bill, dropping events whose excerpt or title repeats an
+    earlier one (chunks restate context, so the same event can be extracted twice).
+    """
+    merged = []
+    seen = set()
+    for event in events:
+        keys = set()
+        if (event.get('text') or '').strip():
+            keys.add(('text', sections.fingerprint(event['text'])))
+        if (event.get('title') or '').strip():
+            keys.add(('title', event['title'].strip().lower()))
+        if keys & seen:
+            continue
+        seen.update(keys)
+        merged.append(event)
+    return merged
+
+
+def log_usage(batch_id, usage):
+    """Print the token usage of a batch."""
+    print(f"Batch {batch_id} usage: {usage['input_tokens']} input, {usage['output_tokens']} output tokens")
+
+
+def prepare_events(bill_id, bill, events, errors=(), cached=None):
+    """
+    Decide whether the extracted events of a bill can be stored now.
+
+    Args:
+        bill_id (str): The bill the events were extracted from
+        bill (dict): The stored bill (event_context profile), or None if missing
+        events (list): Parsed events of every chunk of the bill
+        errors (list): (status, error) of chunks that failed
+        cached (dict): Cached extractions by key, to add the bill's cached_chunks; None
+            to ignore cached_chunks
+
+    Returns:
+        tuple: (bill, merged events, errors) to store, or (None, processing result)
+        when the bill is missing or should be retried instead
+    """
+    if not bill:
+        print(f"Bill {bill_id} not found in database")
+        return None, {
+            'bill_id': bill_id,
+            'status': 'bill_not_found'
+        }
+
+    # Chunks answered from the extraction cache when the batch was submitted
+    if cached is not None and bill.get('cached_chunks'):
+        for key in bill['cached_chunks']:
+            if key in cached:
+                events = events + cached[key]
+            else:
+                errors = list(errors) + [('cache_miss', f"Cached extraction {key} is gone")]
+
+    # A failed chunk means retrying the whole bill, unless this was its last attempt:
+    # then the events of the chunks that succeeded are kept
+    attempt = (bill.get('extraction_attempts') or 0) + 1
+    if errors and attempt < MAX_EXTRACTION_ATTEMPTS:
+        status, error = errors[0]
+        return None, {
+            'bill_id': bill_id,
+            'status': status,
+            'error': error
+        }
+    if errors:
+        print(f"Giving up on {len(errors)} failed chunks of {bill_id} after {attempt} attempts")
+
+    return bill, merge_events(events), errors
+
+
+def insert_bills_events(prepared, embeddings):
+    """
+    Insert the embedded events of many bills with unordered insert_many calls of up to
+    EVENT_INSERT_CHUNK events, then point every bill at its events with one bulk write.
+
+    Args:
+        prepared (list): (bill, events, chunk errors) per bill, from prepare_events
+        embeddings (iterator): Embedding per event, in the order of prepared
+
+    Returns:
+        dict: Processing result per bill_id
+    """
+    documents = []
+    event_errors = {}
+    for bill, events, _ in prepared:
+        bill_id = bill['bill_id']
+        event_errors[bill_id] = []
+        for i, event in enumerate(events):
+            embedding = next(embeddings)
+            try:
+                documents.append((bill_id, i, process_event(bill, event, embedding)))
+            except Exception as e:
+                print(f"Error processing event {i} for bill {bill_id}: {e}")
+                event_errors[bill_id].append(f"Event {i}: {str(e)}")
+
+    inserted = []
+    for start in range(0, len(documents), EVENT_INSERT_CHUNK):
+        chunk = documents[start:start + EVENT_INSERT_CHUNK]
+        inserted.extend(database.insert_events(clients.events_collection(), [document for _, _, document in chunk]))
+
+    event_ids = {bill['bill_id']: [] for bill, _, _ in prepared}
+    for (bill_id, i, document), success in zip(documents, inserted):
+        if success:
+            event_ids[bill_id].append(document['id'])
+        else:
+            event_errors[bill_id].append(f"Event {i}: insert failed")
+
+    # Update bills with successfully processed events. After a section-level
+    # re-extraction the events of unchanged sections are kept.
+    bill_updates = []
+    for bill, _, _ in prepared:
+        bill_id = bill['bill_id']
+        bill_update = {'bill_id': bill_id, 'events': event_ids[bill_id], 'extraction_attempts': None, 'cached_chunks': None}
+        if bill.get('pending_sections') is not None:
+            bill_update['events'] = bill.get('events', []) + event_ids[bill_id]
+            bill_update['pending_sections'] = None
+        bill_updates.append(bill_update)
+    updated = database.update_bills(clients.bills_collection(), bill_updates)
+
+    results = {}
+    for (bill, _, errors), success in zip(prepared, updated):
+        bill_id = bill['bill_id']
+        if success:
+            print(f"Updated bill {bill_id} with {len(event_ids[bill_id])} events")
+            results[bill_id] = {
+                'bill_id': bill_id,
+                'status': 'partial' if errors else 'success',
+                'events_count': len(event_ids[bill_id]),
+                'event_errors': event_errors[bill_id] if event_errors[bill_id] else None
+            }
+        else:
+            print(f"Failed to update bill {bill_id} with events")
+            results[bill_id] = {
+                'bill_id': bill_id,
+                'status': 'database_update_failed'
+            }
+    return results
+
+
+def store_bills_events(bill_events, include_cached_chunks=False):
+    """
+    Embed and insert the extracted events of many bills, with one query for the bills,
+    one embedding stage and bulk writes for the events and bills.
+
+    Args:
+        bill_events (list): (bill_id, parsed events of every chunk, (status, error) of
+            chunks that failed) per bill
+        include_cached_chunks (bool): Add the cached extractions listed in each bill's
+            cached_chunks, for bills submitted with only their uncached chunks
+
+    Returns:
+        list: Processing result with the bill_id and a status, per bill
+    """
+    bill_ids = [bill_id for bill_id, _, _ in bill_events]
+    try:
+        bills = database.get_bills(clients.bills_collection(), bill_ids, profile="event_context")
+        cached = None
+        if include_cached_chunks:
+            cached = database.get_cached_extractions(clients.extraction_cache_collection(),
+                                                     [key for bill in bills.values() for key in bill.get('cached_chunks') or []])
+
+        results = {}
+        prepared = []
+        for bill_id, events, errors in bill_events:
+            bill, *rest = prepare_events(bill_id, bills.get(bill_id), events, errors, cached)
+            if bill is None:
+                results[bill_id] = rest[0]
+            else:
+                prepared.append((bill, *rest))
+
+        contents = [event_content(event) for _, events, _ in prepared for event in events]
+        if contents:
+            print(f"Embedding {len(contents)} events of {len(prepared)} bills")
+        embeddings = iter(embed_contents(contents))
+
+        results.update(insert_bills_events(prepared, embeddings))
+        return [results[bill_id] for bill_id in bill_ids]
+
+    except Exception as e:
+        print(f"Error processing events for bills {bill_ids}: {str(e)}")
+        return [{
+            'bill_id': bill_id,
+            'status': 'processing_error',
+            'error': str(e)
+        } for bill_id in bill_ids]
+
+
+def store_events(bill_id, events, errors=(), include_cached_chunks=False):
+    """store_bills_events for a single bill."""
+    return store_bills_events([(bill_id, events, errors)], include_cached_chunks)[0]
+
+
+def parse_result(result):
+    """
+    Parse one batch result.
+
+    Returns:
+        tuple: (bill_id, cache key of a complete response or None, events,
+        (status, error) or None, usage or None)
+    """
+    bill_id, key = event_extractor.parse_custom_id(result.custom_id)
+
+    if result.result.type != 'succeeded':
+        # Handle different error/failure result types
+        error_msg = "Unknown API error"
+        if hasattr(result.result, 'error') and result.result.error:
+            error_msg = str(result.result.error)
+        print(f"Batch request failed for {result.custom_id}: {error_msg}")
+        return bill_id, None, [], ('api_error', error_msg), None
+
+    usage = result.result.message.usage
+    try:
+        # Parse the events from the response
+        events, complete = parse_events(result.result.message.content[0].text)
+    except json.JSONDecodeError as e:
+        print(f"Error parsing json of events for {result.custom_id}: {e}")
+        return bill_id, None, [], ('decode_error', str(e)), usage
+
+    if not complete:
+        print(f"Response for {result.custom_id} was cut off ({result.result.message.stop_reason}), kept {len(events)} complete events")
+        key = None
+    return bill_id, key, events, None, usage
+
+
+class ResultPipeline:
+    """
+    Stores the results of a batch while they are still being read. The reader fills a
+    bounded queue, PARSE_WORKERS threads parse results and group them by bill, and each
+    group of STORE_GROUP_BILLS complete bills is cached, embedded and written by one of
+    STORE_WORKERS threads. A full store pool blocks the parse workers and a full queue
+    blocks the reader, so memory stays bounded however large the batch.
+
+    A bill is complete once as many results as its chunk count have been parsed; bills
+    without a count (batches recorded before chunk_counts) are stored after the last
+    result.
+
+    Each stored group is added to the batch's stored_bill_ids before the next check can
+    see it, and results of bills already stored are skipped. So when a check fails or
+    times out partway, the next check stores only the remaining bills instead of
+    inserting a second set of events for the rest.
+    """
+
+    def __init__(self, batch_id, chunk_counts=None, stored_bill_ids=()):
+        self.batch_id = batch_id
+        self.chunk_counts = chunk_counts or {}
+        self.stored_bill_ids = set(stored_bill_ids)
+        if self.stored_bill_ids:
+            print(f"Skipping {len(self.stored_bill_ids)} bills of {batch_id} stored by an earlier check")
+        self.lock = threading.Lock()
+        self.bills = {}
+        self.group = []
+        self.usage = dict.fromkeys(USAGE_FIELDS, 0)
+        self.error = None
+        self.store_slots = threading.BoundedSemaphore(max(1, STORE_WORKERS) * 2)
+        self.store_executor = ThreadPoolExecutor(max_workers=max(1, STORE_WORKERS))
+        self.futures = []
+
+    def add(self, result):
+        if event_extractor.parse_custom_id(result.custom_id)[0] in self.stored_bill_ids:
+            return
+        bill_id, key, events, error, usage = parse_result(result)
+
+        with self.lock:
+            if usage is not None:
+                for field in USAGE_FIELDS:
+                    self.usage[field] += getattr(usage, field, None) or 0
+
+            bill = self.bills.setdefault(bill_id, {'events': [], 'errors': [], 'cache': {}, 'received': 0})
+            bill['events'].extend(events)
+            if error:
+                bill['errors'].append(error)
+            if key:
+                bill['cache'][key] = events
+            bill['received'] += 1
+
+            group = None
+            if bill['received'] == self.chunk_counts.get(bill_id):
+                self.group.append((bill_id, self.bills.pop(bill_id)))
+                if len(self.group) >= STORE_GROUP_BILLS:
+                    group, self.group = self.group, []
+
+        if group:
+            self.submit(group)
+
+    def submit(self, group):
+        self.store_slots.acquire()
+        future = self.store_executor.submit(self.store, group)
+        future.add_done_callback(self.stored)
+        with self.lock:
+            self.futures.append(future)
+
+    def stored(self, future):
+        self.store_slots.release()
+        if future.exception():
+            print(f"Error storing bills of batch {self.batch_id}: {future.exception()}")
+            self.error = future.exception()
+
+    def store(self, group):
+        # Store complete responses so the same text is never extracted twice
+        cache_entries = {}
+        for _, bill in group:
+            cache_entries.update(bill['cache'])
+        database.cache_extractions(clients.extraction_cache_collection(), cache_entries)
+
+        processed = store_bills_events([(bill_id, bill['events'], bill['errors']) for bill_id, bill in group],
+                                       include_cached_chunks=True)
+
+        # Bills whose events were inserted must never be stored again, even if the bill
+        # update failed
+        stored = [result['bill_id'] for result in processed if result['status'] in STORED_STATUSES]
+        if not database.add_stored_bills(clients.extraction_batches_collection(), self.batch_id, stored):
+            # Stop storing more bills that a later check could not tell apart
+            raise RuntimeError(f"Could not record {len(stored)} stored bills of batch {self.batch_id}")
+        return processed
+
+    def parse_worker(self, results):
+        while True:
+            result = results.get()
+            if result is None:
+                return
+            if self.error:
+                continue  # drain so the reader never blocks on a failed pipeline
+            try:
+                self.add(result)
+            except Exception as e:
+                print(f"Error handling result {getattr(result, 'custom_id', None)}: {e}")
+                self.error = e
+
+    def run(self, results):
+        """
+        Args:
+            results (iterable): Batch results, as streamed by the batches API
+
+        Returns:
+            list: store_bills_events results of every bill
+        """
+        pending = queue.Queue(maxsize=RESULT_QUEUE_SIZE)
+        workers = [threading.Thread(target=self.parse_worker, args=(pending,), daemon=True)
+                   for _ in range(max(1, PARSE_WORKERS))]
+        for worker in workers:
+            worker.start()
+
+        try:
+            for result in results:
+                if self.error:
+                    break
+                pending.put(result)
+        except Exception as e:
+            self.error = e
+        finally:
+            for _ in workers:
+                pending.put(None)
+            for worker in workers:
+                worker.join()
+
+        try:
+            if not self.error:
+                # Bills without a chunk count, or missing results
+                remaining = self.group + list(self.bills.items())
+                self.group, self.bills = [], {}
+                for start in range(0, len(remaining), STORE_GROUP_BILLS):
+                    self.submit(remaining[start:start + STORE_GROUP_BILLS])
+        finally:
+            self.store_executor.shutdown(wait=True)
+
+        if self.error:
+            # Bills stored so far are in stored_bill_ids; the next check stores the rest
+            raise self.error
+        return [processed for future in self.futures for processed in future.result()]
+
+
+def process_batch_results(batch_id, record=None):
+    """
+    Process results from a completed batch - to be called separately when batch is done
+
+    Args:
+        batch_id (str): Message batch ID
+        record (dict): The batch's extraction_batches document, for the number of
+            requests per bill (chunk_counts) and the bills stored by earlier checks
+            (stored_bill_ids)
+    """
     try:
         # Retrieve batch results
-        batch = anthropic_client.messages.batches.retrieve(batch_id)
+        batch = clients.anthropic_client().messages.batches.retrieve(batch_id)
         
         if batch.processing_status == 'expired' or batch.processing_status == 'cancelled':
             return {
@@ -92,103 +550,19 @@ def process_batch_results(batch_id):
             duration = (ended_at - started_at).total_seconds()
             print(f"Batch {batch_id} processing duration: {duration} seconds")
         
-        processed_bills = []
-        
-        for result in anthropic_client.messages.batches.results(batch_id):
-            bill_id = result.custom_id
-            
-            if result.result.type == 'succeeded':
-                try:
-                    # Parse the events from the response
-                    events_json = result.result.message.content[0].text
-                    events_json = '[' + events_json # Add opening bracket from prefill
-
-                    try:
-                        events = json.loads(events_json)
-                    except json.JSONDecodeError as e:
-                        print(f"Error parsing json of events for bill {bill_id}: {e}")
-                        processed_bills.append({
-                                    'bill_id': bill_id,
-                                    'status': 'decode_error',
-                                    'error': str(e)
-                                })
-                        continue
-                    
-                    # Get bill from database
-                    bill = database.get_bill(bills_collection, bill_id)
-                    
-                    if not bill:
-                        print(f"Bill {bill_id} not found in database")
-                        processed_bills.append({
-                            'bill_id': bill_id,
-                            'status': 'bill_not_found'
-                        })
-                        continue
-                    
-                    event_ids = []
-                    event_errors = []
-                    
-                    for i, event in enumerate(events):
-                        try:
-                            event = process_event(bill, event)
-                            success = database.insert_event(events_collection, event)
-                        
-                            if success:
-                                print(f"Inserted event id {event['id']} for bill {bill_id}")
-                                event_ids.append(event['id'])
-                            else:
-                                print(f"Failed to insert event id {event['id']} for bill {bill_id}")
-                                event_errors.append(f"Event {i}: insert failed")
-                        except Exception as e:
-                            print(f"Error processing event {i} for bill {bill_id}: {e}")
-                            event_errors.append(f"Event {i}: {str(e)}")
-
-                    # Update bill with successfully processed events
-                    bill['events'] = event_ids
-                    success = database.update_bill(bills_collection, bill)
-                    
-                    if success:
-                        print(f"Updated bill {bill_id} with {len(event_ids)} events")
-                        processed_bills.append({
-                            'bill_id': bill_id,
-                            'status': 'success',
-                            'events_count': len(event_ids),
-                            'event_errors': event_errors if event_errors else None
-                        })
-                    else:
-                        print(f"Failed to update bill {bill_id} with events")
-                        processed_bills.append({
-                            'bill_id': bill_id,
-                            'status': 'database_update_failed'
-                        })
-                        
-                except Exception as e:
-                    print(f"Error processing events for bill {bill_id}: {str(e)}")
-                    processed_bills.append({
-                        'bill_id': bill_id,
-                        'status': 'processing_error',
-                        'error': str(e)
-                    })
-            else:
-                # Handle different error/failure result types
-                error_msg = "Unknown API error"
-                if hasattr(result.result, 'error') and result.result.error:
-                    error_msg = str(result.result.error)
-                    print(f"Batch request failed for bill {bill_id}: {error_msg}")
-                else:
-                    print(f"Batch request failed for bill {bill_id}: {error_msg}")
-                
-                processed_bills.append({
-                    'bill_id': bill_id,
-                    'status': 'api_error',
-                    'error': error_msg
-                })
-        
+        # Parse and store bills concurrently while the results are streamed
+        record = record or {}
+        pipeline = ResultPipeline(batch_id, record.get('chunk_counts'), record.get('stored_bill_ids', ()))
+        processed_bills = pipeline.run(clients.anthropic_client().messages.batches.results(batch_id))
+        usage = pipeline.usage
+        log_usage(batch_id, usage)
+
         return {
             'status': 'completed',
             'batch_id': batch_id,
             'processed_bills': processed_bills,
-            'total_processed': len(processed_bills)
+            'total_processed': len(processed_bills),
+            'usage': usage
         }
         
     except Exception as e:
@@ -205,70 +579,118 @@ def cleanup_eventbridge_rule(batch_id):
     """
     
     # Remove targets first
-    events_client.remove_targets(
+    clients.aws_client('events').remove_targets(
         Rule=f'batch-check-{batch_id}',
         Ids=[f'nlp-queue-target-{batch_id}']
     )
     
     # Delete the rule
-    events_client.delete_rule(Name=f'batch-check-{batch_id}')
+    clients.aws_client('events').delete_rule(Name=f'batch-check-{batch_id}')
 
     print(f"Cleaned up EventBridge: batch-check-{batch_id}")
 
-def main(batch_id, bill_ids):
-    result = process_batch_results(batch_id)
+def retry_extraction(bill_ids):
+    """Re-queue extraction, keeping section-level re-extractions limited to their sections."""
+    pending = database.get_bills(clients.bills_collection(), bill_ids, projection={'bill_id': 1, 'pending_sections': 1, 'extraction_attempts': 1})
+
+    # Count the attempt on each bill so bills that keep failing stop being retried
+    retrying = []
+    for bill_id in bill_ids:
+        attempts = (pending.get(bill_id, {}).get('extraction_attempts') or 0) + 1
+        if attempts >= MAX_EXTRACTION_ATTEMPTS:
+            print(f"Not retrying {bill_id}: extraction failed {attempts} times")
+            continue
+        database.update_bill(clients.bills_collection(), {'bill_id': bill_id, 'extraction_attempts': attempts})
+        retrying.append(bill_id)
+    bill_ids = retrying
+
+    targeted = {bill_id: pending[bill_id]['pending_sections'] for bill_id in bill_ids
+                if pending.get(bill_id, {}).get('pending_sections')}
+    full = [bill_id for bill_id in bill_ids if bill_id not in targeted]
+
+    if full:
+        sqs.send_to_nlp_queue({
+            "action": "e_event_extractor",
+            "payload": {
+                "ids": full,
+                "type": "new_bill"
+            }
+        })
+    if targeted:
+        sqs.send_to_nlp_queue({
+            "action": "e_event_extractor",
+            "payload": {
+                "ids": list(targeted),
+                "type": "updated_bill",
+                "sections": targeted
+            }
+        })
+
+def main(batch_id, bill_ids, legacy_rule=True, record=None):
+    """
+    Store the results of a batch if it has ended and retry the bills that failed.
+
+    Args:
+        batch_id (str): Message batch ID
+        bill_ids (list): Bills with requests in the batch
+        legacy_rule (bool): The batch is polled by its own batch-check EventBridge rule,
+            which is deleted once the batch is done; batches registered for the batch
+            poller have none
+        record (dict): The batch's extraction_batches document, if it has one
+
+    Returns:
+        dict: process_batch_results output
+    """
+    result = process_batch_results(batch_id, record)
 
     if result.get('status') == 'completed':
-        print(f"Batch {batch_id} completed successfully, cleaning up EventBridge rule")
-        cleanup_eventbridge_rule(batch_id)
+        print(f"Batch {batch_id} completed successfully")
+        if legacy_rule:
+            cleanup_eventbridge_rule(batch_id)
 
         # Collect bills that failed and need retry
         retry_bills = []
         for bill in result.get('processed_bills', []):
-            if bill.get('status') not in ['success', 'database_update_failed']:
+            if bill.get('status') not in STORED_STATUSES:
                 print(f"Error processing bill {bill.get('bill_id')}: {bill.get('error', 'Unknown error')}. Retrying...")
                 retry_bills.append(bill.get('bill_id'))
 
         if retry_bills:
             print(f"Retrying {len(retry_bills)} failed bills")
-            sqs.send_to_nlp_queue({
-                "action": "e_event_extractor",
-                "payload": {
-                    "ids": retry_bills,
-                    "type": "new_bill"
-                }
-            })
+            retry_extraction(retry_bills)
     
     elif result.get('status') == 'not_ready':
         print(result.get('message'))
     
     elif result.get('status') in ['errored', 'expired']:
         print(f"Batch {batch_id} {result.get('status')}: {result.get('error', 'Unknown error')}")
-        cleanup_eventbridge_rule(batch_id)
+        if legacy_rule:
+            cleanup_eventbridge_rule(batch_id)
         
         # Retry entire batch
         print(f"Retrying all {len(bill_ids)} bills from failed batch")
-        sqs.send_to_nlp_queue({
-            "action": "e_event_extractor",
-            "payload": {
-                "ids": bill_ids,
-                "type": "new_bill"
-            }
-        })
+        retry_extraction(bill_ids)
     
     elif result.get('status') == 'cancelled':
-        print(f"Batch {batch_id} was cancelled. Cleaning up EventBridge rule.")
-        cleanup_eventbridge_rule(batch_id)
+        print(f"Batch {batch_id} was cancelled")
+        if legacy_rule:
+            cleanup_eventbridge_rule(batch_id)
+
+    return result
 
 def handler(payload):
     """Handle event retriever requests from EventBridge or direct calls"""
     batch_id = payload.get('batch_id')
     bill_ids = payload.get('bill_ids')
+    batch = database.get_batch(clients.extraction_batches_collection(), batch_id)
+    if bill_ids is None:
+        # Members of batches too large for the rule input are only recorded in extraction_batches
+        bill_ids = batch['bill_ids'] if batch else []
     
     print(f"Processing batch status check for {batch_id}")
     
     # Process the batch
-    main(batch_id, bill_ids)
+    main(batch_id, bill_ids, record=batch)
 
 if __name__ == "__main__":
     # Example usage for batch processing
@@ -1,15 +1,33 @@
-
 from definitions.congress import Bill
+from definitions.cache import ResponseCache
+import definitions.pdf as pdf
+import definitions.normalize as normalize
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-import PyPDF2
-import io
-import re
+import os
 import datetime
 import time
 import random
+import threading
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
 import common_utils.sqs as sqs
 
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
 # NOTES
 # - add cosponsors to people section
 
@@ -18,36 +36,252 @@ DEFAULT_ARTICLE_AGE = 7
 MAX_RETRIES = 5
 BASE_DELAY = 0.33
 MAX_DELAY = 15
+PAGE_SIZE = 250  # bills per listing page, the API maximum
+
+# HTTP transport tuning
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 4))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 32))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 60))
+
+# Concurrency - Congress.gov allows 5,000 requests per hour per API key
+RATE_LIMIT_PER_HOUR = int(os.getenv("CONGRESS_RATE_LIMIT_PER_HOUR", 5000))
+RATE_LIMIT_SHARERS = int(os.getenv("CONGRESS_RATE_LIMIT_SHARERS", 1))  # containers using the key at once
+RATE_LIMIT_BURST = int(os.getenv("CONGRESS_RATE_LIMIT_BURST", 20))  # requests allowed back to back
+MAX_WORKERS = int(os.getenv("CONGRESS_MAX_WORKERS", 8))
+MAX_IN_FLIGHT = int(os.getenv("CONGRESS_MAX_IN_FLIGHT", 256))
+
+# Documents linked from formatted text
+MAX_LINKED_DOCUMENTS = int(os.getenv("MAX_LINKED_DOCUMENTS", 20))
+MAX_LINKED_DOCUMENT_BYTES = int(os.getenv("MAX_LINKED_DOCUMENT_BYTES", 50 * 1024 * 1024))
+LINKED_DOCUMENT_WORKERS = int(os.getenv("LINKED_DOCUMENT_WORKERS", 4))
+
+
+class HTTPTransport:
+    """
+    Shared HTTP transport with one pooled keep-alive session per host.
+
+    Congress.gov requests alternate between api.congress.gov (JSON) and
+    www.congress.gov / govinfo (documents), so each host gets its own session
+    and connection pool instead of a new TLS handshake per request.
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self._sessions = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def _session_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Accept-Encoding": "gzip, deflate",
+                    "Connection": "keep-alive",
+                })
+                self._sessions[host] = session
+                self._requests[host] = 0
+            self._requests[host] += 1
+        return session
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self._session_for(url).get(url, **kwargs)
+
+    def stats(self):
+        """
+        Report connection reuse per host.
+
+        Returns:
+            dict: host -> requests issued, connections opened and reuse ratio
+        """
+        stats = {}
+        with self._lock:
+            sessions = dict(self._sessions)
+            requests_per_host = dict(self._requests)
+
+        for host, session in sessions.items():
+            connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    connections += getattr(pools[key], "num_connections", 0)
+
+            issued = requests_per_host.get(host, 0)
+            stats[host] = {
+                "requests": issued,
+                "connections": connections,
+                "reuse_ratio": round(1 - connections / issued, 3) if issued else 0.0,
+            }
+        return stats
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of waiting for a rate limit token past the caller's deadline."""
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every worker making API calls.
+
+    The bucket holds up to `capacity` tokens and refills continuously at
+    rate_per_hour / 3600 tokens per second. The hourly quota belongs to the API
+    key, so by default each container gets an equal share of it
+    (RATE_LIMIT_SHARERS) and only a small burst, which keeps short runs from
+    spending the quota of the other containers.
+    """
+
+    def __init__(self, rate_per_hour=None, capacity=RATE_LIMIT_BURST):
+        if rate_per_hour is None:
+            rate_per_hour = RATE_LIMIT_PER_HOUR / max(1, RATE_LIMIT_SHARERS)
+        self.rate = rate_per_hour / 3600.0
+        self.capacity = capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.deadline = None
+        self._lock = threading.Lock()
+
+    def set_deadline(self, deadline):
+        """
+        Args:
+            deadline (float): time.monotonic() after which acquire raises DeadlineExceeded
+                instead of waiting, e.g. shortly before the Lambda times out; None waits
+                as long as it takes
+        """
+        self.deadline = deadline
+
+    def check_deadline(self, wait=0):
+        """Raise DeadlineExceeded if waiting wait seconds would pass the deadline."""
+        if self.deadline is not None and time.monotonic() + wait > self.deadline:
+            raise DeadlineExceeded(f"No API quota left before the deadline (next token in {wait:.1f}s)")
+
+    def _take(self):
+        """Take a token if one is available. Returns 0, or the seconds to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            self.check_deadline(wait)
+            time.sleep(wait)
+
+
+class AsyncRateLimiter(RateLimiter):
+    """Token bucket for coroutines; waits with asyncio.sleep instead of blocking the loop."""
+
+    async def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            self.check_deadline(wait)
+            await asyncio.sleep(wait)
 
 
 class CongressGovAPI:
     BASE_URL = "https://api.congress.gov/v3"
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, transport=None, rate_limiter=None, max_workers=MAX_WORKERS, cache=None):
         self.api_key = api_key
+        self.transport = transport or HTTPTransport()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else ResponseCache.from_env()
+
+    def _map(self, func, items):
+        """Apply func to each item, fanning out over a bounded worker pool when enabled."""
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
 
-    def _make_request(self, endpoint, params=None):
+    def _make_request(self, endpoint, params=None, use_cache=True):
         if params is None:
                 params = {}
         url = f"{self.BASE_URL}/{endpoint}"
+
+        key = entry = None
+        headers = {}
+        if self.cache and use_cache:
+            key, entry, fresh = self.cache.lookup(endpoint, params)
+            if fresh:
+                return entry["body"]
+            if entry:
+                headers = self.cache.validators(entry)
         
         params["api_key"] = self.api_key
         # Use exponential backoff for retries
         for attempt in range(MAX_RETRIES):
             try:
-                response = requests.get(url, params=params)
+                self.rate_limiter.acquire()
+                response = self.transport.get(url, params=params, headers=headers)
+                if response.status_code == 304 and entry:
+                    self.cache.revalidated(key, entry)
+                    return entry["body"]
                 response.raise_for_status()  # Raise an exception for HTTP errors
-                return response.json()
+                data = response.json()
+                if key:
+                    self.cache.store(key, endpoint, data, response.headers)
+                return data
+            except DeadlineExceeded:
+                raise  # out of time, retrying cannot help
             except Exception as e:
-                print(f"Error making request: {e}")
-                print(f'Response: {response}')
                 if attempt == MAX_RETRIES - 1:
+                    logger.error(f"Error making request to {endpoint}: {e}")
                     raise e
+                logger.warning(f"Request to {endpoint} failed (attempt {attempt + 1} of {MAX_RETRIES}): {e}")
                 # Exponential backoff with jitter
                 delay = min(BASE_DELAY * 2 ** attempt + random.uniform(0, 1), MAX_DELAY)
                 time.sleep(delay)
 
     def get_bills(self, congress=None, bill_type=None, date_since_days=1, offset=0):
+        """
+        Get one page of bills updated in the last date_since_days days as Bill objects.
+        See list_bills for the arguments.
+        """
+        return self.get_bills_details(self.list_bills(congress, bill_type, date_since_days, offset))
+
+    def list_bills(self, congress=None, bill_type=None, date_since_days=1, offset=0):
+        """
+        Get one page of the bill listing for bills updated in the last date_since_days days.
+
+        Returns:
+            list: Listing entries (congress, type, number, updateDate, latestAction, ...)
+        """
+        return self.list_bills_page(congress, bill_type, date_since_days, offset)[0]
+
+    def list_bills_page(self, congress=None, bill_type=None, date_since_days=1, offset=0):
+        """
+        list_bills, with the listing's pagination for planning the rest of the run.
+
+        Returns:
+            tuple: (listing entries, pagination dict with the total "count")
+        """
         endpoint = "bill"
         params = {}
         if congress:
@@ -59,49 +293,95 @@ class CongressGovAPI:
         params["fromDateTime"] = date_n_days_ago.strftime("%Y-%m-%dT00:00:00Z")
 
         params["offset"] = offset
-        params["limit"] = 250  # Maximum limit
+        params["limit"] = PAGE_SIZE  # Maximum limit
+
+        logger.info(f'making request with params {params}')
+        # Listings must always reflect the latest updates
+        data = self._make_request(endpoint, params=params, use_cache=False)
+
+        return data.get("bills", []), data.get("pagination", {})
+
+    def get_bills_details(self, bill_summaries):
+        """
+        Fetch the details of listing entries concurrently and return them as Bill objects,
+        each keeping the listing entry it was fetched for.
+        """
+        logger.info(f'Found {len(bill_summaries)} bills. Requesting more info...')
+        keyed = [(bill_summary, key) for bill_summary in bill_summaries if (key := self._summary_key(bill_summary))]
+        # Listed bills were updated since the listing's fromDateTime, so a cached copy may be older
+        details = self._map(lambda entry: self.get_bill_details(*entry[1], use_cache=False), keyed)
+        return [Bill(self, bill_details['bill'], summary=bill_summary) for (bill_summary, _), bill_details in zip(keyed, details)]
+
+    def fan_out_pages(self, pagination, offset, date_since_days, skip=()):
+        """
+        Enqueue an ingest message for every page after offset in one batched send, so
+        pages are ingested in parallel. Enqueued pages carry fan_out=False and do not
+        enqueue anything themselves.
 
-        print('making request with params', params)
-        data = self._make_request(endpoint, params=params)
+        Args:
+            pagination (dict): Pagination of the planner's listing page
+            skip (iterable): Offsets already enqueued for this run
 
-        bills_data = []
-        bills = data.get("bills", [])
-        bills_data.extend(bills)
+        Returns:
+            tuple: (offsets enqueued, offsets that could not be enqueued)
+        """
+        count = pagination.get("count", 0)
+        skip = set(skip)
+        offsets = [page_offset for page_offset in range(offset + PAGE_SIZE, count, PAGE_SIZE) if page_offset not in skip]
+        if not offsets:
+            return [], []
 
-        next_page = data.get("pagination", {}).get("next", "")
-        if next_page:
-            print(f'Invoking lambda for next page: {offset+250}/{data["pagination"]["count"]}')
-            next_page = {
+        logger.info(f'Fanning out {len(offsets)} pages of {count} bills')
+        pages = [
+            {
                 'action': 'e_ingest',
                 'payload': {
-                    "offset": offset+250,
-                    "date_since_days": date_since_days
+                    "offset": page_offset,
+                    "date_since_days": date_since_days,
+                    "fan_out": False
                 }
             }
-            sqs.send_to_scraper_queue(next_page)
-
-        bill_objects = []
-        print(f'Found {len(bills_data)} bills. Requesting more info...')
-        for bill_summary in bills_data:
-            congress_num = bill_summary.get("congress")
-            bill_type = bill_summary.get("type")
-            bill_number = bill_summary.get("number")
-
-            if congress_num and bill_type and bill_number:
-                bill_details = self.get_bill_details(congress_num, bill_type, bill_number)
-                bill_objects.append(Bill(self, bill_details['bill']))
-            else:
-                # Fallback if summary doesn't have full details, try parsing billUri
-                bill_uri = bill_summary.get("billUri")
-                if bill_uri:
-                    parts = bill_uri.split("/")
-                    if len(parts) >= 6 and parts[-4] == "bill":
-                        congress_num = int(parts[-3])
-                        bill_type = parts[-2]
-                        bill_number = int(parts[-1])
-                        bill_details = self.get_bill_details(congress_num, bill_type, bill_number)
-                        bill_objects.append(Bill(self, bill_details['bill']))
-        return bill_objects
+            for page_offset in offsets
+        ]
+        unsent = [page['payload']['offset'] for page in sqs.send_batch_to_scraper_queue(pages)]
+        return [page_offset for page_offset in offsets if page_offset not in unsent], unsent
+
+    def _summary_key(self, bill_summary):
+        """Return (congress, bill_type, bill_number) for a bill listing entry, or None."""
+        congress_num = bill_summary.get("congress")
+        bill_type = bill_summary.get("type")
+        bill_number = bill_summary.get("number")
+
+        if congress_num and bill_type and bill_number:
+            return congress_num, bill_type, bill_number
+
+        # Fallback if summary doesn't have full details, try parsing billUri
+        bill_uri = bill_summary.get("billUri")
+        if bill_uri:
+            parts = bill_uri.split("/")
+            if len(parts) >= 6 and parts[-4] == "bill":
+                return int(parts[-3]), parts[-2], int(parts[-1])
+        return None
+
+    def hydrate_bills(self, bills, text=False):
+        """
+        Fetch sub-resources (actions, text, subjects) for many bills at once.
+
+        Args:
+            bills: List of Bill objects
+            text (bool): Whether to download and parse the bill document
+
+        Returns:
+            list: (bill, bill_data, error) tuples in input order. bill_data is
+            None and error is set when hydration failed for that bill.
+        """
+        def _hydrate(bill):
+            try:
+                return bill, bill.to_dict(text=text), None
+            except Exception as e:
+                return bill, None, e
+
+        return self._map(_hydrate, bills)
 
     def get_bill(self, congress, bill_type, bill_number):
         """
@@ -121,19 +401,19 @@ class CongressGovAPI:
             if bill_details and 'bill' in bill_details:
                 return Bill(self, bill_details['bill'])
             else:
-                print(f"No bill data returned for {bill_type}{bill_number}-{congress}")
+                logger.info(f"No bill data returned for {bill_type}{bill_number}-{congress}")
                 return None
         except Exception as e:
-            print(f"Error fetching bill {bill_type}{bill_number}-{congress}: {e}")
+            logger.error(f"Error fetching bill {bill_type}{bill_number}-{congress}: {e}")
             return None
     
-    def get_bill_details(self, congress, bill_type, bill_number):
+    def get_bill_details(self, congress, bill_type, bill_number, use_cache=True):
         endpoint = f"bill/{congress}/{bill_type}/{bill_number}"
-        return self._make_request(endpoint)
+        return self._make_request(endpoint, use_cache=use_cache)
 
-    def get_bill_actions(self, congress, bill_type, bill_number):
+    def get_bill_actions(self, congress, bill_type, bill_number, use_cache=True):
         endpoint = f"bill/{congress}/{bill_type}/{bill_number}/actions"
-        return self._make_request(endpoint).get("actions", [])
+        return self._make_request(endpoint, use_cache=use_cache).get("actions", [])
 
     def get_bill_amendments(self, congress, bill_type, bill_number):
         endpoint = f"bill/{congress}/{bill_type}/{bill_number}/amendments"
@@ -147,70 +427,53 @@ class CongressGovAPI:
         endpoint = f"bill/{congress}/{bill_type}/{bill_number}/relatedbills"
         return self._make_request(endpoint).get("relatedBills", [])
 
-    def get_bill_subjects(self, congress, bill_type, bill_number):
+    def get_bill_subjects(self, congress, bill_type, bill_number, use_cache=True):
         endpoint = f"bill/{congress}/{bill_type}/{bill_number}/subjects"
-        return self._make_request(endpoint).get("subjects", [])
+        return self._make_request(endpoint, use_cache=use_cache).get("subjects", [])
 
     def get_bill_summaries(self, congress, bill_type, bill_number):
         endpoint = f"bill/{congress}/{bill_type}/{bill_number}/summaries"
         return self._make_request(endpoint).get("summaries", [])
 
-    def get_bill_text(self, congress, bill_type, bill_number):
+    def get_bill_text(self, congress, bill_type, bill_number, use_cache=True):
         endpoint = f"bill/{congress}/{bill_type}/{bill_number}/text"
-        return self._make_request(endpoint).get("textVersions", [])
+        return self._make_request(endpoint, use_cache=use_cache).get("textVersions", [])
 
     # Scraping utilities
     def get_document_text(self, url):
         try:
-            response = self.fetch_with_retry(requests.get, url)
+            response = self.fetch_with_retry(self.transport.get, url)
             
             if response.status_code == 200:
-                # For PDF content
-                if 'pdf' in url:
-                    text = self._extract_text_from_pdf(response.content)
-                else:
-                    text = self._extract_text_from_html(response.text)
-                
-                # Clean the extracted text
-                text = self._clean_text(text)
-                print("Extracted {} characters".format(len(text)))
-                return text
+                return self._parse_document(url, response)
             else:
                 raise Exception(f"Failed to retrieve document: {response.status_code}")
                 
         except Exception as e:
-            print(f"Error retrieving document: {e}")
+            logger.error(f"Error retrieving document: {e}")
             return f"Error retrieving document: {e}"
 
 
-    def _extract_text_from_html(self, html_content):
+    def _parse_document(self, url, response):
+        """Extract and clean text from a downloaded document (requests or httpx response)."""
+        # For PDF content
+        if 'pdf' in url:
+            text = self._extract_text_from_pdf(response.content)
+        else:
+            text = self._extract_text_from_html(response.text, base_url=url)
+        
+        # Clean the extracted text
+        text = self._clean_text(text)
+        logger.info(f"Extracted {len(text)} characters")
+        return text
+
+    def _extract_text_from_html(self, html_content, base_url=None):
         try:
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove script and style elements
-            for script_or_style in soup(["script", "style"]):
-                script_or_style.extract()
-            
-            # Get text content
-            text = soup.get_text()
-
-            # Get links
-            links = soup.find_all('a')
-
-            for link in links:
-                link = link.get('href')
-                if 'pdf' in link:
-                    try:
-                        response = requests.get(link)
-                        if response.status_code == 200:
-                            text += f"\n{self._extract_text_from_pdf(response.content)}"
-                        else:
-                            print(f"Failed to retrieve linked document: {response.status_code}")
-                    except Exception as e:
-                        print(f"Error retrieving linked document: {e}")
+            text, links = self._parse_html(html_content)
+
+            # Fetch linked PDFs concurrently, appending them in document order
+            text = "\n".join([text] + self._fetch_linked_documents(links, base_url))
 
-            
             # Clean up text: break into lines and remove leading/trailing space
             lines = (line.strip() for line in text.splitlines())
             
@@ -222,29 +485,82 @@ class CongressGovAPI:
             
             return text
         except Exception as e:
-            print(f"Error extracting text from HTML: {e}")
+            logger.error(f"Error extracting text from HTML: {e}")
             return html_content  # Return original content as fallback
     
+    def _parse_html(self, html_content):
+        """Return (text, hrefs) for an HTML document, using lxml when installed and BeautifulSoup otherwise."""
+        if lxml_html is not None:
+            try:
+                root = lxml_html.document_fromstring(html_content)
+
+                # Remove script and style elements
+                for script_or_style in list(root.iter("script", "style")):
+                    script_or_style.drop_tree()
+
+                return root.text_content(), root.xpath("//a/@href")
+            except Exception as e:
+                logger.warning(f"lxml could not parse document, falling back to BeautifulSoup: {e}")
+
+        # Parse HTML with BeautifulSoup
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        # Remove script and style elements
+        for script_or_style in soup(["script", "style"]):
+            script_or_style.extract()
+
+        return soup.get_text(), [link.get('href') for link in soup.find_all('a')]
+
+    def _fetch_linked_documents(self, links, base_url=None):
+        """Download and extract the unique PDFs linked from a document. Returns texts in link order."""
+        urls = list(dict.fromkeys(
+            urljoin(base_url, link) if base_url else link
+            for link in links if link and 'pdf' in link
+        ))
+        if len(urls) > MAX_LINKED_DOCUMENTS:
+            logger.info(f"Document links {len(urls)} PDFs, fetching the first {MAX_LINKED_DOCUMENTS}")
+            urls = urls[:MAX_LINKED_DOCUMENTS]
+        if not urls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(LINKED_DOCUMENT_WORKERS, len(urls))) as executor:
+            texts = list(executor.map(self._fetch_linked_pdf, urls))
+        return [text for text in texts if text is not None]
+
+    def _fetch_linked_pdf(self, url):
+        try:
+            response = self.fetch_with_retry(self.transport.get, url, stream=True)
+            with response:
+                if response.status_code != 200:
+                    logger.warning(f"Failed to retrieve linked document: {response.status_code}")
+                    return None
+
+                if int(response.headers.get("Content-Length") or 0) > MAX_LINKED_DOCUMENT_BYTES:
+                    logger.warning(f"Skipping linked document over {MAX_LINKED_DOCUMENT_BYTES} bytes: {url}")
+                    return None
+
+                content = bytearray()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    content += chunk
+                    if len(content) > MAX_LINKED_DOCUMENT_BYTES:
+                        logger.warning(f"Skipping linked document over {MAX_LINKED_DOCUMENT_BYTES} bytes: {url}")
+                        return None
+
+            return self._extract_text_from_pdf(bytes(content))
+        except Exception as e:
+            logger.error(f"Error retrieving linked document: {e}")
+            return None
+
     def _extract_text_from_pdf(self, pdf_content):
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            # Check if PDF is encrypted
-            if pdf_reader.is_encrypted:
-                print("PDF is encrypted, cannot extract text")
-                return "PDF is encrypted, cannot extract text"
-            
-            # Extract text from all pages
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
-            
-            return text
-            
+            # Stream pages from disk and join once instead of growing a string per page
+            return "".join(f"{page}\n" for page in pdf.iter_pdf_text(pdf_content))
+
+        except pdf.EncryptedPDFError:
+            logger.warning("PDF is encrypted, cannot extract text")
+            return "PDF is encrypted, cannot extract text"
         except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
+            logger.error(f"Error extracting text from PDF: {e}")
             return "Error extracting text from PDF"
 
     def _clean_text(self, text):
@@ -252,33 +568,7 @@ class CongressGovAPI:
         Clean extracted text by removing extra spaces, normalizing whitespace,
         handling special characters, and improving readability.
         """
-        if not text:
-            return ""
-            
-        # Replace multiple spaces with a single space
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Replace multiple newlines with a single newline
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        
-        # Fix common PDF extraction issues
-        text = re.sub(r'(\w)-\s+(\w)', r'\1\2', text)  # Fix hyphenation
-        text = re.sub(r'(\d+)\s*\.\s*(\d+)', r'\1.\2', text)  # Fix decimal numbers
-        
-        # Replace special characters that might be incorrectly encoded
-        text = text.replace('â€™', "'")
-        text = text.replace('â€œ', '"')
-        text = text.replace('â€', '"')
-        text = text.replace('â€"', '-')
-        text = text.replace('â€"', '--')
-        
-        # Remove non-printable characters
-        text = ''.join(char for char in text if char.isprintable() or char in '\n\t')
-        
-        # Trim leading/trailing whitespace
-        text = text.strip()
-        
-        return text
+        return normalize.clean_text(text)
 
     def fetch_with_retry(self, func, *args, **kwargs):
         for attempt in range(MAX_RETRIES):
@@ -288,3 +578,187 @@ class CongressGovAPI:
                 if attempt == MAX_RETRIES - 1:
                     raise e
                 time.sleep(min(BASE_DELAY * 2 ** attempt + random.uniform(0, 1), MAX_DELAY))
+
+
+class AsyncCongressGovAPI:
+    """
+    Asyncio counterpart of CongressGovAPI built on httpx.
+
+    Endpoint methods mirror the sync client but are coroutines. Requests share
+    one AsyncClient (HTTP/2 multiplexed when the `h2` package is installed and
+    the server negotiates it), are bounded by a semaphore and draw from the
+    same hourly token bucket. Document parsing is CPU bound, so it runs on a
+    worker thread with the sync client's extractors.
+
+    Bills created by this client must be hydrated with hydrate_bill before
+    calling Bill.to_dict, since the Bill getters are synchronous.
+    """
+    BASE_URL = CongressGovAPI.BASE_URL
+
+    def __init__(self, api_key, rate_limiter=None, max_in_flight=MAX_IN_FLIGHT, http2=True):
+        if httpx is None:
+            raise ImportError("AsyncCongressGovAPI requires httpx (pip install 'httpx[http2]')")
+
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter or AsyncRateLimiter()
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._parser = CongressGovAPI(api_key, max_workers=1, cache=False)
+        self.client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=POOL_MAXSIZE, max_keepalive_connections=POOL_MAXSIZE),
+            headers={"Accept-Encoding": "gzip, deflate"},
+            follow_redirects=True,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+        self._parser.transport.close()
+
+    async def _get(self, url, params=None, rate_limited=False):
+        # Use exponential backoff for retries
+        for attempt in range(MAX_RETRIES):
+            try:
+                if rate_limited:
+                    await self.rate_limiter.acquire()
+                async with self._semaphore:
+                    response = await self.client.get(url, params=params)
+                response.raise_for_status()
+                return response
+            except DeadlineExceeded:
+                raise  # out of time, retrying cannot help
+            except Exception as e:
+                if attempt == MAX_RETRIES - 1:
+                    logger.error(f"Error making request to {url}: {e}")
+                    raise e
+                logger.warning(f"Request to {url} failed (attempt {attempt + 1} of {MAX_RETRIES}): {e}")
+                # Exponential backoff with jitter
+                delay = min(BASE_DELAY * 2 ** attempt + random.uniform(0, 1), MAX_DELAY)
+                await asyncio.sleep(delay)
+
+    async def _make_request(self, endpoint, params=None):
+        if params is None:
+            params = {}
+        params["api_key"] = self.api_key
+        response = await self._get(f"{self.BASE_URL}/{endpoint}", params=params, rate_limited=True)
+        return response.json()
+
+    async def get_bill(self, congress, bill_type, bill_number):
+        try:
+            bill_details = await self.get_bill_details(congress, bill_type, bill_number)
+            if bill_details and 'bill' in bill_details:
+                return Bill(self, bill_details['bill'])
+            else:
+                logger.info(f"No bill data returned for {bill_type}{bill_number}-{congress}")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching bill {bill_type}{bill_number}-{congress}: {e}")
+            return None
+
+    async def get_bill_details(self, congress, bill_type, bill_number):
+        endpoint = f"bill/{congress}/{bill_type}/{bill_number}"
+        return await self._make_request(endpoint)
+
+    async def get_bill_actions(self, congress, bill_type, bill_number):
+        endpoint = f"bill/{congress}/{bill_type}/{bill_number}/actions"
+        return (await self._make_request(endpoint)).get("actions", [])
+
+    async def get_bill_amendments(self, congress, bill_type, bill_number):
+        endpoint = f"bill/{congress}/{bill_type}/{bill_number}/amendments"
+        return (await self._make_request(endpoint)).get("amendments", [])
+
+    async def get_bill_committees(self, congress, bill_type, bill_number):
+        endpoint = f"bill/{congress}/{bill_type}/{bill_number}/committees"
+        return (await self._make_request(endpoint)).get("committees", [])
+
+    async def get_bill_related_bills(self, congress, bill_type, bill_number):
+        endpoint = f"bill/{congress}/{bill_type}/{bill_number}/relatedbills"
+        return (await self._make_request(endpoint)).get("relatedBills", [])
+
+    async def get_bill_subjects(self, congress, bill_type, bill_number):
+        endpoint = f"bill/{congress}/{bill_type}/{bill_number}/subjects"
+        return (await self._make_request(endpoint)).get("subjects", [])
+
+    async def get_bill_summaries(self, congress, bill_type, bill_number):
+        endpoint = f"bill/{congress}/{bill_type}/{bill_number}/summaries"
+        return (await self._make_request(endpoint)).get("summaries", [])
+
+    async def get_bill_text(self, congress, bill_type, bill_number):
+        endpoint = f"bill/{congress}/{bill_type}/{bill_number}/text"
+        return (await self._make_request(endpoint)).get("textVersions", [])
+
+    async def get_document_text(self, url):
+        try:
+            response = await self._get(url)
+            return await asyncio.to_thread(self._parser._parse_document, url, response)
+        except Exception as e:
+            logger.error(f"Error retrieving document: {e}")
+            return f"Error retrieving document: {e}"
+
+    async def _get_bill_document(self, bill):
+        text_versions = await self.get_bill_text(bill.congress, bill.bill_type, bill.bill_number)
+        bill.data["textVersions"] = text_versions
+
+        if bill._reuse_stored_text(text_versions):
+            return None
+
+        for url in Bill._document_urls(text_versions):
+            logger.info(f"URL: {url}")
+            try:
+                text = await self.get_document_text(url)
+                bill._set_text_version(url, text)
+                return text
+            except Exception as e:
+                logger.error(f"Error fetching document text from {url}: {e}")
+        return ""
+
+    async def hydrate_bill(self, bill, text=False):
+        """
+        Fetch actions, subjects and (optionally) the document for a bill concurrently.
+
+        Returns:
+            dict: bill.to_dict(text=text)
+        """
+        fetches = {}
+        if isinstance(bill.data.get("actions"), dict) and "count" in bill.data["actions"]:
+            fetches["actions"] = self.get_bill_actions(bill.congress, bill.bill_type, bill.bill_number)
+        if isinstance(bill.data.get("subjects"), dict) and "count" in bill.data["subjects"]:
+            fetches["subjects"] = self.get_bill_subjects(bill.congress, bill.bill_type, bill.bill_number)
+        if text and 'text' not in bill.data and not bill.data.get("text_reused"):
+            fetches["text"] = self._get_bill_document(bill)
+
+        results = dict(zip(fetches, await asyncio.gather(*fetches.values())))
+
+        bill.data["actions"] = Bill._format_actions(results["actions"]) if "actions" in results else bill.data.get("actions", [])
+        bill.data["subjects"] = Bill._format_subjects(results["subjects"]) if "subjects" in results else bill.get_subjects()
+        if results.get("text") is not None:
+            bill.data["text"] = results["text"]
+
+        return bill.to_dict(text=text)
+
+    async def hydrate_bills(self, bills, text=False):
+        """
+        Hydrate many bills on the event loop.
+
+        Returns:
+            list: (bill, bill_data, error) tuples in input order, matching
+            CongressGovAPI.hydrate_bills
+        """
+        results = await asyncio.gather(*(self.hydrate_bill(bill, text=text) for bill in bills), return_exceptions=True)
+        return [
+            (bill, None, result) if isinstance(result, Exception) else (bill, result, None)
+            for bill, result in zip(bills, results)
+        ]
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+import common_utils.clients as clients
+
+# Constants
+DEFAULT_TTL = int(os.getenv("CONGRESS_CACHE_TTL", 6 * 60 * 60))  # seconds an entry is served without revalidation
+DEFAULT_MAX_ENTRIES = int(os.getenv("CONGRESS_CACHE_MAX_ENTRIES", 50000))
+DEFAULT_MAX_AGE = int(os.getenv("CONGRESS_CACHE_MAX_AGE", 30 * 24 * 60 * 60))  # seconds a revalidatable entry is kept
+
+
+def cache_key(endpoint, params=None):
+    """Stable key for an API request. The api_key param is stripped so keys survive key rotation."""
+    params = {k: v for k, v in (params or {}).items() if k != "api_key"}
+    raw = f"{endpoint}?{json.dumps(params, sort_keys=True, default=str)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MemoryBackend:
+    """In-process LRU backend. Survives warm Lambda invocations only."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteBackend:
+    """Local disk backend for backfills and development, evicting least recently used entries."""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, entry TEXT NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT entry FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return json.loads(row[0])
+
+    def set(self, key, entry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, entry, accessed_at) VALUES (?, ?, ?)",
+                (key, json.dumps(entry), time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+
+class MongoBackend:
+    """
+    Mongo backend shared across Lambda invocations. A TTL index on
+    accessed_at drops entries that have not been used for max_age seconds.
+    """
+
+    def __init__(self, collection, max_age=DEFAULT_MAX_AGE):
+        self.collection = collection
+        try:
+            self.collection.create_index("accessed_at", expireAfterSeconds=max_age)
+        except Exception as e:
+            print(f"Could not ensure TTL index on API cache: {e}")
+
+    def get(self, key):
+        doc = self.collection.find_one_and_update(
+            {"_id": key},
+            {"$set": {"accessed_at": datetime.now(timezone.utc)}},
+            projection={"entry": 1}
+        )
+        return doc["entry"] if doc else None
+
+    def set(self, key, entry):
+        self.collection.replace_one(
+            {"_id": key},
+            {"entry": entry, "accessed_at": datetime.now(timezone.utc)},
+            upsert=True
+        )
+
+    def delete(self, key):
+        self.collection.delete_one({"_id": key})
+
+
+class S3Backend:
+    """S3 backend shared across Lambda invocations. Expire old objects with a bucket lifecycle rule."""
+
+    def __init__(self, bucket, prefix="api_cache/"):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.s3 = boto3.client("s3")
+
+    def get(self, key):
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=f"{self.prefix}{key}.json")
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        return json.loads(response["Body"].read())
+
+    def set(self, key, entry):
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=f"{self.prefix}{key}.json",
+            Body=json.dumps(entry),
+            ContentType="application/json"
+        )
+
+    def delete(self, key):
+        self.s3.delete_object(Bucket=self.bucket, Key=f"{self.prefix}{key}.json")
+
+
+class ResponseCache:
+    """
+    Conditional-request cache in front of CongressGovAPI._make_request.
+
+    Entries younger than ttl are served without a request. Older entries are
+    revalidated with If-None-Match / If-Modified-Since when the server supplied
+    an ETag or Last-Modified header, and evicted otherwise. Backend failures
+    are logged and treated as misses so the cache can never fail a scrape.
+    """
+
+    def __init__(self, backend, ttl=DEFAULT_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.stats = {"hits": 0, "stale": 0, "revalidated": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the cache selected by CONGRESS_CACHE: memory, sqlite[:path], mongo or s3.
+        Returns None when caching is disabled.
+        """
+        mode = os.getenv("CONGRESS_CACHE", "")
+        if not mode:
+            return None
+
+        kind, _, arg = mode.partition(":")
+        if kind == "memory":
+            backend = MemoryBackend()
+        elif kind == "sqlite":
+            backend = SQLiteBackend(arg or "congress_api_cache.sqlite3")
+        elif kind == "mongo":
+            backend = MongoBackend(clients.mongo_db()['api_cache'])
+        elif kind == "s3":
+            backend = S3Backend(arg or os.environ.get("SCRAPER_BUCKET_NAME"))
+        else:
+            raise ValueError(f"Unknown CONGRESS_CACHE backend: {mode}")
+
+        print(f"Using {kind} response cache")
+        return cls(backend)
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def lookup(self, endpoint, params=None):
+        """
+        Returns:
+            tuple: (key, entry, fresh). entry is None on a miss; fresh is True
+            when the entry can be returned without contacting the server.
+        """
+        key = cache_key(endpoint, params)
+        try:
+            entry = self.backend.get(key)
+        except Exception as e:
+            print(f"Cache lookup failed for {endpoint}: {e}")
+            entry = None
+
+        if entry is None:
+            self._count("misses")
+            return key, None, False
+
+        if time.time() - entry["stored_at"] < self.ttl:
+            self._count("hits")
+            return key, entry, True
+
+        if not entry.get("etag") and not entry.get("last_modified"):
+            # Stale and cannot be revalidated
+            self._safe(self.backend.delete, key)
+            self._count("misses")
+            return key, None, False
+
+        self._count("stale")
+        return key, entry, False
+
+    def validators(self, entry):
+        """Conditional request headers for a stale entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key, endpoint, body, headers):
+        entry = {
+            "endpoint": endpoint,
+            "body": body,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        }
+        self._safe(self.backend.set, key, entry)
+
+    def revalidated(self, key, entry):
+        """Mark a stale entry fresh again after a 304 Not Modified."""
+        self._count("revalidated")
+        entry["stored_at"] = time.time()
+        self._safe(self.backend.set, key, entry)
+
+    def _safe(self, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"Cache write failed: {e}")
@@ -1,15 +1,100 @@
+import hashlib
+import common_utils.sections as sections
+
+# Prefixes of the messages CongressGovAPI returns instead of document text on failure
+DOCUMENT_ERROR_PREFIXES = ("Error retrieving document", "Error extracting text", "PDF is encrypted")
+
+# Sub-resources that each cost extra API calls to hydrate
+SUB_RESOURCES = frozenset({"actions", "text", "subjects"})
+
+
 class Document:
     def __init__(self, api_client, data):
         self.api_client = api_client
         self.data = data
 
 class Bill(Document):
-    def __init__(self, api_client, data):
+    def __init__(self, api_client, data, summary=None):
+        """
+        Args:
+            data (dict): Bill details payload
+            summary (dict): Entry of the bill listing the bill was found in, or None
+        """
         super().__init__(api_client, data)
+        self.summary = summary
+        self.changed = None
         self.congress = data["congress"]
         self.bill_type = data["type"].lower()
         self.bill_number = data["number"]
         self.bill_id = f"{data["type"]}{data["number"]}-{data["congress"]}"
+        self.existing = None
+
+    def set_existing(self, existing_bill, changed=None):
+        """
+        Attach the stored bill document so unchanged data can be reused instead of re-fetched.
+
+        Args:
+            existing_bill (dict): The stored bill, or None
+            changed (set): Sub-resources that changed since the bill was stored (see
+                changed_resources). The others are copied from the stored bill. None
+                means everything is re-fetched.
+        """
+        self.existing = existing_bill
+        self.changed = changed
+        if not existing_bill or changed is None:
+            return
+
+        for resource in SUB_RESOURCES - set(changed):
+            stored = existing_bill.get(resource)
+            if resource == "text":
+                self._reuse_text()
+            elif isinstance(stored, list):
+                self.data[resource] = stored
+
+    @staticmethod
+    def summary_id(summary):
+        """Bill ID for an entry of the bill listing, or None if it lacks type, number or congress."""
+        if summary.get("type") and summary.get("number") and summary.get("congress"):
+            return f"{summary["type"]}{summary["number"]}-{summary["congress"]}"
+        return None
+
+    @staticmethod
+    def changed_resources(summary, stored):
+        """
+        Decide from a bill listing entry alone which sub-resources changed since the bill was stored.
+
+        Args:
+            summary (dict): Entry of the bill listing (updateDate, updateDateIncludingText, latestAction)
+            stored (dict): Stored bill with at least the "change_detection" profile fields, or None
+
+        Returns:
+            set: Sub-resources to fetch; empty when the bill is unchanged
+        """
+        # New bills, and bills stored before update dates were recorded, need everything
+        if not stored or not stored.get("update_date"):
+            return set(SUB_RESOURCES)
+
+        changed = set()
+        latest_action = summary.get("latestAction") or {}
+        stored_action = stored.get("latest_action") or {}
+        if (latest_action.get("actionDate"), latest_action.get("text")) != (stored_action.get("actionDate"), stored_action.get("text")):
+            changed.add("actions")
+        if summary.get("updateDateIncludingText") != stored.get("update_date_including_text"):
+            changed.add("text")
+        if summary.get("updateDate") != stored.get("update_date"):
+            # Any other edit (subjects, title, sponsors); the detail call refreshes the rest
+            changed.add("subjects")
+        return changed
+
+    def _use_cache(self, resource):
+        """
+        Whether a cached response may be served for a sub-resource. A cached copy of a
+        resource that changed, or of any resource of a listed bill whose changes are
+        unknown, can predate the change.
+        """
+        if self.changed is not None:
+            return resource not in self.changed
+        return self.summary is None
 
     def get_id(self):
         return self.bill_id
@@ -28,23 +113,23 @@ class Bill(Document):
 
     def get_actions(self):
         if isinstance(self.data.get("actions"), dict) and "count" in self.data.get("actions", {}):
-            self.data["actions"] = self.api_client.get_bill_actions(self.congress, self.bill_type, self.bill_number)
-
-            actions = []
-            for action in self.data["actions"]:
-                new_action = {
-                    "date": action.get("actionDate"),
-                    "text": action.get("text"),
-                    "code": action.get("actionCode")
-                }
-                actions.append(new_action)
-
-            self.data["actions"] = actions
-
+            actions = self.api_client.get_bill_actions(self.congress, self.bill_type, self.bill_number, use_cache=self._use_cache("actions"))
+            self.data["actions"] = self._format_actions(actions)
         else:
             self.data["actions"] = self.data.get("actions", [])
         return self.data["actions"]
 
+    @staticmethod
+    def _format_actions(actions):
+        return [
+            {
+                "date": action.get("actionDate"),
+                "text": action.get("text"),
+                "code": action.get("actionCode")
+            }
+            for action in actions
+        ]
+
     def get_latest_action(self):
         if not isinstance(self.data.get("actions"), list):
             actions = self.get_actions()
@@ -108,18 +193,22 @@ class Bill(Document):
         return []
 
     def get_subjects(self):
-        subjects = []
         if isinstance(self.data.get("subjects"), dict) and "count" in self.data.get("subjects", {}):
-            self.data["subjects"] = self.api_client.get_bill_subjects(self.congress, self.bill_type, self.bill_number)
-
-            if len(self.data["subjects"]["legislativeSubjects"]) > 0:
-                subjects = [subj.get("name", "") for subj in self.data["subjects"]["legislativeSubjects"]]
-            if self.data["subjects"]["policyArea"]:
-                subjects.append(self.data["subjects"]["policyArea"])
-        
-        self.data["subjects"] = subjects
+            subjects = self.api_client.get_bill_subjects(self.congress, self.bill_type, self.bill_number, use_cache=self._use_cache("subjects"))
+            self.data["subjects"] = self._format_subjects(subjects)
+        elif not isinstance(self.data.get("subjects"), list):
+            self.data["subjects"] = []
         return self.data["subjects"]
 
+    @staticmethod
+    def _format_subjects(subjects):
+        formatted = []
+        if len(subjects["legislativeSubjects"]) > 0:
+            formatted = [subj.get("name", "") for subj in subjects["legislativeSubjects"]]
+        if subjects["policyArea"]:
+            formatted.append(subjects["policyArea"])
+        return formatted
+
     def get_summary(self):
         self.data["summary"] = ""
         if isinstance(self.data.get("summaries"), dict) and "count" in self.data.get("summaries", {}):
@@ -131,29 +220,97 @@ class Bill(Document):
         return self.data["summary"]
 
     def get_text(self):
-        if 'text' not in self.data:
-            self.data["textVersions"] = self.api_client.get_bill_text(self.congress, self.bill_type, self.bill_number)
+        """
+        Returns:
+            str: The bill text, or None when the stored text is unchanged and reused
+            (it is then left out of to_dict so the stored copy is not rewritten)
+        """
+        if 'text' not in self.data and not self.data.get("text_reused"):
+            self.data["textVersions"] = self.api_client.get_bill_text(self.congress, self.bill_type, self.bill_number, use_cache=self._use_cache("text"))
 
-            if isinstance(self.data["textVersions"], list) and len(self.data["textVersions"]) > 0:
-                recent = self.data["textVersions"][-1]
+            if self._reuse_stored_text(self.data["textVersions"]):
+                return None
 
-                text = ""
-                for format in recent.get("formats", []):
-                    url = format.get('url')
-                    if format.get("type") == "Formatted Text" or format.get("type") == "PDF":
-                        print(f"URL: {url}")
+            text = ""
+            for url in self._document_urls(self.data["textVersions"]):
+                print(f"URL: {url}")
 
-                        try:
-                            text = self.api_client.get_document_text(url)
-                            break  # Exit after successfully processing the first valid URL
-                        except Exception as e:
-                            print(f"Error fetching document text from {url}: {e}")
+                try:
+                    text = self.api_client.get_document_text(url)
+                    self._set_text_version(url, text)
+                    break  # Exit after successfully processing the first valid URL
+                except Exception as e:
+                    print(f"Error fetching document text from {url}: {e}")
 
-                self.data["text"] = text
-            else:
-                self.data["text"] = ""
+            self.data["text"] = text
 
-        return self.data["text"]
+        return self.data.get("text")
+
+    def _reuse_text(self):
+        """
+        Mark the stored text as current. Only text recorded with a text_version is
+        reused, which excludes stored failure messages.
+        """
+        stored = (self.existing or {}).get("text_version")
+        if not stored or not self.existing.get("text_length"):
+            return False
+        self.data["text_reused"] = True
+        self.data["text_version"] = stored
+        return True
+
+    def _reuse_stored_text(self, text_versions):
+        """
+        Reuse the stored text when the latest text version matches the fingerprint
+        (version type, date and URL) recorded when that text was downloaded.
+        """
+        stored = (self.existing or {}).get("text_version")
+        if not stored:
+            return False
+
+        for url in self._document_urls(text_versions):
+            fingerprint = self._text_fingerprint(text_versions, url)
+            if all(stored.get(field) == value for field, value in fingerprint.items()):
+                if self._reuse_text():
+                    print(f"Text version unchanged for {self.bill_id}, reusing stored text")
+                    return True
+        return False
+
+    def _set_text_version(self, url, text):
+        if not text or text.startswith(DOCUMENT_ERROR_PREFIXES):
+            return
+        self.data["text_version"] = dict(
+            self._text_fingerprint(self.data["textVersions"], url),
+            hash=hashlib.sha256(text.encode("utf-8")).hexdigest()
+        )
+
+        # A new version whose content matches the stored text (e.g. the same text
+        # republished under a new date or URL) keeps the stored text and its section
+        # hashes; only the fingerprint is updated
+        stored = (self.existing or {}).get("text_version") or {}
+        if stored.get("hash") == self.data["text_version"]["hash"] and self.existing.get("text_length"):
+            print(f"Text content unchanged for {self.bill_id}, keeping stored text")
+            self.data["text_reused"] = True
+
+    @staticmethod
+    def _text_fingerprint(text_versions, url):
+        recent = text_versions[-1]
+        return {
+            "type": recent.get("type"),
+            "date": recent.get("date"),
+            "url": url
+        }
+
+    @staticmethod
+    def _document_urls(text_versions):
+        """URLs of the parseable formats (Formatted Text or PDF) of the most recent text version."""
+        if not isinstance(text_versions, list) or len(text_versions) == 0:
+            return []
+
+        recent = text_versions[-1]
+        return [
+            format.get('url') for format in recent.get("formats", [])
+            if format.get("type") == "Formatted Text" or format.get("type") == "PDF"
+        ]
     
     def get_sponsors(self):
         if 'sponsors' in self.data and 'people' not in self.data:
@@ -191,12 +348,30 @@ class Bill(Document):
             "published_date": self.data.get("introducedDate"),
             'actions': self.get_actions(),
             'people': self.get_sponsors(),
+            'subjects': self.get_subjects(),
             'url': f'https://www.congress.gov/bill/{self.congress}/{self.bill_type}/{self.bill_number}',
-            'status': self.get_status()
+            'status': self.get_status(),
+            # Listing-level markers used to skip unchanged bills on the next ingest. They
+            # come from the listing entry, which changed_resources compares them with; a
+            # bill fetched without one stores none and is hydrated in full next time
+            'update_date': (self.summary or {}).get("updateDate"),
+            'update_date_including_text': (self.summary or {}).get("updateDateIncludingText"),
+            'latest_action': (self.summary or {}).get("latestAction")
         }
 
         if text:
-            bill['text'] = self.get_text()
+            bill_text = self.get_text()
+            bill['text_version'] = self.data.get('text_version')
+            if self.data.get("text_reused"):
+                # Unchanged: leave the stored text and its section hashes as they are
+                del bill['text']
+                bill['text_length'] = self.existing.get("text_length")
+            else:
+                bill['text'] = bill_text
+                bill['text_length'] = len(bill_text)
+                # Per-section fingerprints let later updates target only the sections that changed
+                has_text = bill_text and not bill_text.startswith(DOCUMENT_ERROR_PREFIXES)
+                bill['section_hashes'] = sections.section_hashes(bill_text) if has_text else []
 
         return bill
 
@@ -0,0 +1,171 @@
+import re
+
+# Constants
+CHUNK_SIZE = 1024 * 1024  # characters per chunk in streaming mode
+
+# Patterns from the original CongressGovAPI._clean_text, compiled once. Whitespace is
+# collapsed first, so later patterns only ever see single spaces.
+_HYPHEN_BREAK = re.compile(r'- (?=\w)')
+_DECIMAL = re.compile(r'(\d+) ?\. ?(\d+)')
+_NUMERIC_RUN = re.compile(r'[\d .]+')
+# Superset of the spaced forms of _DECIMAL ('1 .2', '1 . 2', '1. 2') minus the leading digit
+_SPACED_DECIMAL_TAIL = re.compile(r' \. ?\d|\. \d')
+_MOJIBAKE = re.compile('â€™|â€œ|â€')
+_MOJIBAKE_REPLACEMENTS = {'â€™': "'", 'â€œ': '"', 'â€': '"'}
+
+# A whitespace run after a character that no pattern can match across (not a digit,
+# '.', '-' or whitespace). Streaming mode only splits the input at these runs.
+_SAFE_SPLIT = re.compile(r'[^\s\d.\-]\s')
+
+# Deletes ASCII control characters; str.translate has a fast path for ASCII strings
+_ASCII_NON_PRINTABLE = {codepoint: None for codepoint in range(128) if not chr(codepoint).isprintable()}
+
+
+def _is_word(char):
+    # Same definition as \w for str patterns
+    return char.isalnum() or char == '_'
+
+
+def _collapse_whitespace(text):
+    r"""re.sub(r'\s+', ' ', text) via str.split, which uses the same definition of whitespace."""
+    collapsed = ' '.join(text.split())
+    if text[:1].isspace():
+        collapsed = ' ' + collapsed
+    if text[-1:].isspace() and collapsed != ' ':
+        collapsed += ' '
+    return collapsed
+
+
+def _fix_hyphenation(text):
+    r"""
+    re.sub(r'(\w)- (\w)', r'\1\2', text), scanning for the literal '- ' instead of every \w.
+    Like the regex, a match cannot reuse the trailing character of the previous match.
+    """
+    pieces = []
+    copied = 0
+    match_end = 0
+    for match in _HYPHEN_BREAK.finditer(text):
+        i = match.start()
+        if i - 1 >= match_end and i > 0 and _is_word(text[i - 1]):
+            pieces.append(text[copied:i])
+            copied = i + 2
+            match_end = i + 3
+
+    if not pieces:
+        return text
+    pieces.append(text[copied:])
+    return ''.join(pieces)
+
+
+def _fix_decimals(text):
+    r"""
+    _DECIMAL.sub(r'\1.\2', text), applied only to the runs of digits, dots and spaces
+    around a spaced decimal. Matches never cross other characters, so each run can be
+    rewritten on its own; all other matches are replaced by themselves.
+    """
+    pieces = []
+    copied = 0
+    for match in _SPACED_DECIMAL_TAIL.finditer(text):
+        start = match.start()
+        if start < copied or start == 0 or not text[start - 1].isdecimal():
+            continue
+
+        run_start = start - 1
+        while run_start > copied and (text[run_start - 1].isdecimal() or text[run_start - 1] in ' .'):
+            run_start -= 1
+        run_end = _NUMERIC_RUN.match(text, start).end()
+
+        pieces.append(text[copied:run_start])
+        pieces.append(_DECIMAL.sub(r'\1.\2', text[run_start:run_end]))
+        copied = run_end
+
+    if not pieces:
+        return text
+    pieces.append(text[copied:])
+    return ''.join(pieces)
+
+
+def _remove_non_printable(text):
+    if text.isascii():
+        return text.translate(_ASCII_NON_PRINTABLE)
+
+    # Delete each distinct non-printable character; str.replace is far cheaper than a per-character filter
+    for char in set(text):
+        if not (char.isprintable() or char in '\n\t'):
+            text = text.replace(char, '')
+    return text
+
+
+def _replace_mojibake(match):
+    return _MOJIBAKE_REPLACEMENTS[match.group(0)]
+
+
+def _normalize(text):
+    # Replace whitespace runs with a single space
+    text = _collapse_whitespace(text)
+
+    # Fix common PDF extraction issues
+    text = _fix_hyphenation(text)  # Fix hyphenation
+    text = _fix_decimals(text)  # Fix decimal numbers
+
+    # Replace special characters that might be incorrectly encoded
+    if 'â€' in text:
+        text = _MOJIBAKE.sub(_replace_mojibake, text)
+
+    # Remove non-printable characters
+    if not text.isprintable():
+        text = _remove_non_printable(text)
+
+    return text
+
+
+def clean_text(text):
+    """
+    Clean extracted text by removing extra spaces, normalizing whitespace,
+    handling special characters, and improving readability.
+
+    Output is identical to the original multi-pass CongressGovAPI._clean_text.
+    """
+    if not text:
+        return ""
+
+    return _normalize(text).strip()
+
+
+def _find_split(buffer, start):
+    for match in _SAFE_SPLIT.finditer(buffer, start):
+        # The character before the split must survive normalization so strip() behaves as on the whole text
+        if buffer[match.start()].isprintable():
+            return match.start() + 1
+    return None
+
+
+def iter_clean_text(pieces, chunk_size=CHUNK_SIZE):
+    """
+    Streaming clean_text for large documents.
+
+    Args:
+        pieces: Iterable of raw text pieces (e.g. PDF pages)
+        chunk_size (int): Approximate number of characters normalized at a time
+
+    Yields:
+        str: Cleaned chunks whose concatenation equals clean_text(''.join(pieces))
+    """
+    buffer = ""
+    first = True
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) >= chunk_size:
+            split = _find_split(buffer, chunk_size - 1)
+            if split is None:
+                break
+
+            chunk = _normalize(buffer[:split])
+            if first:
+                chunk = chunk.lstrip()
+                first = False
+            yield chunk
+            buffer = buffer[split:]
+
+    chunk = _normalize(buffer)
+    yield chunk.strip() if first else chunk.rstrip()
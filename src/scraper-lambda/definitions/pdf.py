@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import PyPDF2
+
+# Constants
+MAX_PDF_PAGES = int(os.getenv("PDF_MAX_PAGES", 5000))
+PDF_TIME_BUDGET = float(os.getenv("PDF_TIME_BUDGET", 300))  # seconds per document
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 50))
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 200))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class EncryptedPDFError(Exception):
+    pass
+
+
+def _get_executor(workers):
+    """
+    Process pool shared by every thread in this process, created on first use.
+    Returns None when multiprocessing is unavailable (e.g. no /dev/shm on Lambda).
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None and workers > 1:
+            try:
+                # spawn, not fork: documents are parsed from worker threads
+                _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, NotImplementedError) as e:
+                print(f"Process pool unavailable, extracting PDF pages serially: {e}")
+                _executor = False
+        return _executor or None
+
+
+def _spool(pdf_content):
+    """Write the PDF to a temp file so pages are read from disk instead of a second in-memory copy."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(pdf_content)
+        return f.name
+
+
+def iter_pdf_pages(path, start=0, stop=None, deadline=None):
+    """Yield the text of pages [start, stop) of the PDF at path, stopping early at deadline."""
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        stop = len(reader.pages) if stop is None else stop
+        for page_num in range(start, stop):
+            if deadline and time.monotonic() > deadline:
+                return
+            yield reader.pages[page_num].extract_text()
+
+
+def _extract_range(path, start, stop, deadline_seconds):
+    # Runs in a worker process; monotonic clocks are not shared, so the budget is passed as a duration
+    deadline = time.monotonic() + deadline_seconds
+    return list(iter_pdf_pages(path, start, stop, deadline))
+
+
+def iter_pdf_text(pdf_content, max_pages=MAX_PDF_PAGES, time_budget=PDF_TIME_BUDGET, workers=PDF_WORKERS):
+    """
+    Yield the text of a PDF page by page, in order.
+
+    Extraction stops after max_pages pages or time_budget seconds, whichever
+    comes first. Large documents are split into page ranges extracted on a
+    process pool when one is available.
+
+    Raises:
+        EncryptedPDFError: if the PDF is encrypted
+    """
+    deadline = time.monotonic() + time_budget
+    path = _spool(pdf_content)
+    try:
+        with open(path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            if reader.is_encrypted:
+                raise EncryptedPDFError("PDF is encrypted")
+            page_count = len(reader.pages)
+
+        if page_count > max_pages:
+            print(f"PDF has {page_count} pages, extracting the first {max_pages}")
+            page_count = max_pages
+
+        executor = _get_executor(workers) if page_count >= PARALLEL_MIN_PAGES else None
+        if executor is None:
+            extracted = 0
+            for text in iter_pdf_pages(path, 0, page_count, deadline):
+                extracted += 1
+                yield text
+        else:
+            extracted = yield from _iter_parallel(executor, path, page_count, deadline)
+
+        if extracted < page_count:
+            print(f"PDF time budget of {time_budget}s exhausted after {extracted}/{page_count} pages")
+    finally:
+        os.remove(path)
+
+
+def _disable_executor():
+    global _executor
+    with _executor_lock:
+        _executor = False
+
+
+def _iter_parallel(executor, path, page_count, deadline):
+    extracted = 0
+    try:
+        futures = [
+            executor.submit(_extract_range, path, start, min(start + PAGES_PER_TASK, page_count), deadline - time.monotonic())
+            for start in range(0, page_count, PAGES_PER_TASK)
+        ]
+    except BrokenProcessPool as e:
+        print(f"PDF process pool failed, continuing serially: {e}")
+        _disable_executor()
+        futures = []
+        for text in iter_pdf_pages(path, 0, page_count, deadline):
+            extracted += 1
+            yield text
+
+    try:
+        for future in futures:
+            try:
+                pages = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except TimeoutError:
+                break
+            except BrokenProcessPool as e:
+                print(f"PDF process pool failed, continuing serially: {e}")
+                _disable_executor()
+                for text in iter_pdf_pages(path, extracted, page_count, deadline):
+                    extracted += 1
+                    yield text
+                break
+            extracted += len(pages)
+            yield from pages
+            if len(pages) < PAGES_PER_TASK and extracted < page_count:
+                # The worker ran out of time part way through its range
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+    return extracted
@@ -1,9 +1,13 @@
-from definitions.api import CongressGovAPI
+from definitions.api import CongressGovAPI, DeadlineExceeded
+from definitions.congress import Bill
 import os
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
+import time
+import common_utils.clients as clients
 import common_utils.database as database
+import common_utils.indexes as indexes
+import common_utils.sections as sections
 import common_utils.sqs as sqs
+import common_utils.text_store as text_store
 from datetime import datetime
 import logging
 
@@ -16,122 +20,233 @@ logger = logging.getLogger(__name__)
 
 # Replace with your actual API key
 API_KEY = os.environ.get("CONGRESS_API_KEY")
-uri = os.environ.get("DB_URI")
 
-client = MongoClient(uri, server_api=ServerApi('1'))
-db = client['auxiom_database']
-bills_collection = db['bills']
+WRITE_SLICE = int(os.getenv("INGEST_WRITE_SLICE", 25))  # bills hydrated and written together
+DEADLINE_MARGIN = 60  # seconds kept back from the Lambda timeout for the last write and re-enqueueing
+MAX_CONTINUATIONS = int(os.getenv("INGEST_MAX_CONTINUATIONS", 8))  # invocations a page may take beyond the first
 
-api = CongressGovAPI(API_KEY)
 
-def main(offset, date_since_days=1):
-        bills = api.get_bills(date_since_days=date_since_days, congress=119, offset=offset)
+# Built on first use; the response cache and HTTP pools persist across warm invocations
+@clients.memoized
+def get_api():
+    return CongressGovAPI(API_KEY)
 
-        logger.info(f"Retrieved {len(bills)} bills updated in the last {date_since_days} day(s) on offset {offset}")
+
+def detect_changes(bill_summaries):
+    """
+    Compare listing entries with the stored bills in one query and drop unchanged bills.
+
+    Returns:
+        tuple: (summaries of changed bills, {bill_id: set of sub-resources to fetch})
+    """
+    summary_ids = [Bill.summary_id(summary) for summary in bill_summaries]
+    stored = database.get_bills(clients.bills_collection(), [bill_id for bill_id in summary_ids if bill_id], profile="change_detection")
+
+    changed_summaries = []
+    changes = {}
+    for summary, bill_id in zip(bill_summaries, summary_ids):
+        if not bill_id:
+            # Unidentifiable entries are always hydrated in full
+            changed_summaries.append(summary)
+            continue
+
+        changed = Bill.changed_resources(summary, stored.get(bill_id))
+        if not changed:
+            logger.debug(f"  Skipping {bill_id} - unchanged since last ingest")
+            continue
+
+        changes[bill_id] = changed
+        changed_summaries.append(summary)
+
+    logger.info(f"{len(changed_summaries)}/{len(bill_summaries)} bills changed since last ingest")
+    return changed_summaries, changes
+
+def plan_pages(pagination, offset, date_since_days, run_id):
+    """
+    Enqueue the remaining listing pages of a planner run. Each run records the pages it
+    has enqueued, so a redelivered planner message only enqueues the pages that are
+    missing instead of spending the API quota on every page again.
+    """
+    runs_collection = clients.scraper_runs_collection()
+    planned = database.get_planned_pages(runs_collection, run_id)
+    if planned is None:
+        raise RuntimeError(f"Could not read the pages planned for run {run_id}")
+    if planned:
+        logger.info(f"Run {run_id} already enqueued {len(planned)} pages")
+
+    sent, unsent = get_api().fan_out_pages(pagination, offset, date_since_days, skip=planned)
+    database.record_planned_pages(runs_collection, run_id, sent)
+    if unsent:
+        # Fail the planner so its message is retried; the retry only enqueues these pages
+        raise RuntimeError(f"Could not enqueue pages {unsent}")
+
+
+def write_bills(hydrated, updates, revisions, propogates, seen):
+    """
+    Classify hydrated bills against their stored copies, write them with one bulk upsert
+    and add the stored changes to updates, revisions, propogates and seen.
+
+    Args:
+        hydrated (list): (bill, bill_data, error) tuples from hydrate_bills
+    """
+    # Classify every bill first, then write them all with one bulk upsert
+    pending = []
+    for i, (bill, bill_data, error) in enumerate(hydrated):
+        try:
+            bill_id = bill.get_id()
+
+            if isinstance(error, DeadlineExceeded):
+                continue  # hydrated again by the page's continuation
+            if error:
+                raise error
+
+            existing_bill = bill.existing
+
+            logger.info(f"Processing bill {bill_id}: {bill.get_title()[:100]}...")
+            logger.debug(f"  Latest Action Date: {bill.get_latest_action_date()}")
+
+            new_text_length = bill_data.get('text_length') or 0
+            logger.debug(f"  Fetched bill text: {new_text_length} characters")
+            logger.debug(f"  Subjects: {bill.data.get('subjects')}")
+
+            change = None
+            changed_sections = None
+            if existing_bill:
+                # Bill exists - determine what type of update is needed
+                logger.info(f"  Bill {bill_id} exists in database - checking for changes")
+                
+                existing_text_length = existing_bill.get('text_length') or 0
+                existing_action_date = existing_bill.get('latest_action_date', '')
+                new_action_date = bill_data.get('latest_action_date', '')
+                
+                logger.debug(f"  Existing text length: {existing_text_length}, New text length: {new_text_length}")
+                logger.debug(f"  Existing action date: {existing_action_date}, New action date: {new_action_date}")
+                
+                # Determine change type BEFORE updating
+                section_changes = sections.compare(existing_bill.get('section_hashes'), bill_data.get('section_hashes'))
+
+                # First time seeing this bill's text
+                if existing_text_length == 0 and new_text_length > 0:
+                    logger.info(f"  ✓ NEW TEXT detected for {bill_id} ({new_text_length} chars)")
+                    change = 'update'
+                # One or more sections were edited, added or removed
+                elif section_changes and (section_changes['changed'] or section_changes['added'] or section_changes['removed']):
+                    changed_sections = section_changes['changed'] + section_changes['added']
+                    logger.info(f"  ✓ REVISION detected for {bill_id} ({len(section_changes['changed'])} changed, "
+                                f"{len(section_changes['added'])} added, {len(section_changes['removed'])} removed sections)")
+                    change = 'revision'
+                # Bills stored before section hashes: significant revision (text length changed by >1000 chars)
+                elif section_changes is None and existing_text_length > 0 and abs(existing_text_length - new_text_length) > 1000:
+                    text_diff = new_text_length - existing_text_length
+                    logger.info(f"  ✓ REVISION detected for {bill_id} (text changed by {text_diff:+d} chars)")
+                    change = 'revision'
+                # Action date changed but no significant text change
+                elif existing_action_date != new_action_date:
+                    logger.info(f"  ✓ PROPAGATION detected for {bill_id} (action date: {existing_action_date} → {new_action_date})")
+                    change = 'propagation'
+                else:
+                    logger.debug(f"  No significant changes detected for {bill_id}")
+                    
+            else:
+                # Bill doesn't exist - insert as new
+                logger.info(f"  Bill {bill_id} is NEW - inserting into database")
+                logger.debug(f"  Text length: {new_text_length}, Action date: {bill_data.get('latest_action_date', '')}")
+                change = 'update'
+
+            # Move the text out of line when BILL_TEXT_STORE is set
+            text_store.externalize(bill_data)
+            pending.append((bill, bill_data, change, changed_sections))
+
+        except Exception as e:
+            logger.error(f"Error processing bill {i} ({bill.get_id()}): {e}", exc_info=True)
+
+    results = database.upsert_bills(clients.bills_collection(), [bill_data for _, bill_data, _, _ in pending])
+
+    # Only report changes that were stored
+    for (bill, bill_data, change, changed_sections), result in zip(pending, results):
+        bill_id = bill.get_id()
+        if result == "failed":
+            logger.error(f"  Failed to write bill {bill_id}")
+            continue
+
+        if result == "inserted":
+            logger.info(f"  ✓ NEW BILL inserted: {bill_id}")
+        if change == 'update':
+            updates.append(bill_id)
+        elif change == 'revision':
+            # None means the whole bill needs re-extraction
+            revisions.append({'bill_id': bill_id, 'sections': changed_sections})
+        elif change == 'propagation':
+            propogates.append({
+                'bill_id': bill_id, 
+                'latest_action': bill.get_latest_action(), 
+                'date': bill_data.get('latest_action_date', ''), 
+                'status': bill_data.get('status', '')
+            })
+        seen.add(bill_id)
+
+
+def main(offset, date_since_days=1, fan_out=True, run_id=None):
+        bill_summaries, pagination = get_api().list_bills_page(date_since_days=date_since_days, congress=119, offset=offset)
+
+        # Enqueue the other pages first so they are ingested in parallel with this one.
+        # Planning is recorded per run, so a retried or continued planner skips pages
+        # already enqueued
+        if fan_out:
+            plan_pages(pagination, offset, date_since_days, run_id)
+
+        # Drop unchanged bills before any detail calls
+        changed_summaries, changes = detect_changes(bill_summaries)
+        bills = get_api().get_bills_details(changed_summaries)
+
+        logger.info(f"Retrieved {len(bills)} changed bills of {len(bill_summaries)} updated in the last {date_since_days} day(s) on offset {offset}")
 
         updates = []
         revisions = []
         propogates = []
         seen = set()
         
-        for i, bill in enumerate(bills):
-            try:
-                # Not historical bills
-                published_date = bill.get_published_date()
-                if published_date and datetime.strptime(published_date, '%Y-%m-%d').year <= 2022:
-                    logger.debug(f"Skipping historical bill from {published_date}")
-                    continue
-                    
-                # Check if bill is already in database
-                bill_id = bill.get_id()
+        # Cheap filters first so only relevant bills are hydrated
+        candidates = []
+        queued = set()
+        for bill in bills:
+            # Not historical bills
+            published_date = bill.get_published_date()
+            if published_date and datetime.strptime(published_date, '%Y-%m-%d').year <= 2022:
+                logger.debug(f"Skipping historical bill from {published_date}")
+                continue
 
-                if bill_id in seen:
-                    logger.debug(f"Bill {bill_id} already processed in this batch")
-                    continue
+            bill_id = bill.get_id()
 
-                existing_bill = database.get_bill(bills_collection, bill_id)
+            if bill_id in queued:
+                logger.debug(f"Bill {bill_id} already processed in this batch")
+                continue
 
-                logger.info(f"Processing bill {bill_id}: {bill.get_title()[:100]}...")
-                logger.debug(f"  Latest Action Date: {bill.get_latest_action_date()}")
+            # Skip bills with no text
+            if bill.get_text_count() == 0:
+                logger.info(f"  Skipping {bill_id} - no text available (text_count=0)")
+                continue
 
-                # Skip bills with no text
-                if bill.get_text_count() == 0:
-                    logger.info(f"  Skipping {bill_id} - no text available (text_count=0)")
-                    continue
+            queued.add(bill_id)
+            candidates.append(bill)
 
-                # Convert bill to dictionary with all information
-                bill_data = bill.to_dict(text=True)
-                new_text_length = len(bill_data.get('text', ''))
-                logger.debug(f"  Fetched bill text: {new_text_length} characters")
+        # Stored copies let hydration reuse unchanged actions and text instead of re-fetching them
+        existing_bills = database.get_bills(clients.bills_collection(), queued, profile="ingest_compare")
+        for bill in candidates:
+            bill.set_existing(existing_bills.get(bill.get_id()), changes.get(bill.get_id()))
 
-                subjects = bill.get_subjects()
-                logger.debug(f"  Subjects: {subjects}")
+        # Fetch actions, text and subjects concurrently and write each slice as soon as it
+        # is hydrated, so running out of time or quota keeps the bills already fetched
+        logger.info(f"Hydrating {len(candidates)} bills with up to {get_api().max_workers} workers")
+        for start in range(0, len(candidates), WRITE_SLICE):
+            # Document downloads are not rate limited, so check the time between slices too
+            get_api().rate_limiter.check_deadline()
+            hydrated = get_api().hydrate_bills(candidates[start:start + WRITE_SLICE], text=True)
+            write_bills(hydrated, updates, revisions, propogates, seen)
 
-                if existing_bill:
-                    # Bill exists - determine what type of update is needed
-                    logger.info(f"  Bill {bill_id} exists in database - checking for changes")
-                    
-                    existing_text_length = len(existing_bill.get('text', ''))
-                    existing_action_date = existing_bill.get('latest_action_date', '')
-                    new_action_date = bill_data.get('latest_action_date', '')
-                    
-                    logger.debug(f"  Existing text length: {existing_text_length}, New text length: {new_text_length}")
-                    logger.debug(f"  Existing action date: {existing_action_date}, New action date: {new_action_date}")
-                    
-                    # Determine change type BEFORE updating
-                    change_detected = False
-                    
-                    # First time seeing this bill's text
-                    if existing_text_length == 0 and new_text_length > 0:
-                        logger.info(f"  ✓ NEW TEXT detected for {bill_id} ({new_text_length} chars)")
-                        updates.append(bill_id)
-                        change_detected = True
-                    # Significant revision has been made (text length changed by >1000 chars)
-                    elif existing_text_length > 0 and abs(existing_text_length - new_text_length) > 1000:
-                        text_diff = new_text_length - existing_text_length
-                        logger.info(f"  ✓ REVISION detected for {bill_id} (text changed by {text_diff:+d} chars)")
-                        revisions.append(bill_id)
-                        change_detected = True
-                    # Action date changed but no significant text change
-                    elif existing_action_date != new_action_date:
-                        logger.info(f"  ✓ PROPAGATION detected for {bill_id} (action date: {existing_action_date} → {new_action_date})")
-                        propogates.append({
-                            'bill_id': bill_id, 
-                            'latest_action': bill.get_latest_action(), 
-                            'date': new_action_date, 
-                            'status': bill_data.get('status', '')
-                        })
-                        change_detected = True
-                    else:
-                        logger.debug(f"  No significant changes detected for {bill_id}")
-                    
-                    # Now update the bill in database
-                    success = database.update_bill(bills_collection, bill_data)
-                    
-                    if success:
-                        logger.debug(f"  Database updated successfully for {bill_id}")
-                    elif not change_detected:
-                        logger.debug(f"  No database changes needed for {bill_id}")
-                    else:
-                        logger.warning(f"  Database update returned no changes for {bill_id}")
-                        
-                else:
-                    # Bill doesn't exist - insert as new
-                    logger.info(f"  Bill {bill_id} is NEW - inserting into database")
-                    logger.debug(f"  Text length: {new_text_length}, Action date: {bill_data.get('latest_action_date', '')}")
-                    
-                    success = database.insert_bill(bills_collection, bill_data)
-                    
-                    if success:
-                        logger.info(f"  ✓ NEW BILL inserted: {bill_id}")
-                        updates.append(bill_id)
-                    else:
-                        logger.error(f"  Failed to insert new bill {bill_id}")
-                
-                seen.add(bill_id)
-
-            except Exception as e:
-                logger.error(f"Error processing bill {i} ({bill.get_id() if 'bill' in locals() else 'unknown'}): {e}", exc_info=True)
+            unfinished = sum(isinstance(error, DeadlineExceeded) for _, _, error in hydrated)
+            if unfinished:
+                raise DeadlineExceeded(f"{len(seen)} of {len(candidates)} changed bills written")
 
         logger.info(f"="*60)
         logger.info(f"SUMMARY: Processed {len(seen)} bills from API")
@@ -143,21 +258,58 @@ def main(offset, date_since_days=1):
         if updates:
             logger.info(f"New bill IDs: {updates}")
         if revisions:
-            logger.info(f"Revised bill IDs: {revisions}")
+            logger.info(f"Revised bill IDs: {[r['bill_id'] for r in revisions]}")
         if propogates:
             logger.info(f"Propagated bill IDs: {[p['bill_id'] for p in propogates]}")
 
         return updates, revisions, propogates
 
-def handler(payload):
+def continue_page(payload, error):
+    """
+    Re-enqueue a page that ran out of time or API quota. Bills written so far are
+    unchanged for the continuation, so it only fetches the rest.
+    """
+    continuation = payload.get('continuation', 0) + 1
+    if continuation > MAX_CONTINUATIONS:
+        raise RuntimeError(f"Page {payload.get('offset', 0)} unfinished after {MAX_CONTINUATIONS} continuations") from error
+
+    logger.warning(f"Out of time on page {payload.get('offset', 0)} ({error}), re-enqueueing it as continuation {continuation}")
+    sqs.send_to_scraper_queue({
+        'action': 'e_ingest',
+        'payload': dict(payload, continuation=continuation)
+    })
+
+
+def handler(payload, context=None):
     offset = payload.get('offset', 0)
     date_since_days = payload.get('date_since_days', 1)
+    # Pages enqueued by a planner run carry fan_out=False
+    fan_out = payload.get('fan_out', True)
+    # Planner runs are identified by day unless the payload names one, e.g. for a manual re-run
+    run_id = payload.setdefault('run_id', f"{datetime.now().date().isoformat()}:{date_since_days}")
 
-    logger.info(f"Handler invoked with offset={offset}, date_since_days={date_since_days}")
-    
-    updates, revisions, propogates = main(offset, date_since_days)
+    logger.info(f"Handler invoked with offset={offset}, date_since_days={date_since_days}, fan_out={fan_out}")
+
+    # Stop waiting for API quota shortly before the Lambda times out; the rest of the
+    # page continues in a new message instead of the whole page being retried
+    deadline = None
+    if context is not None:
+        deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN
+    get_api().rate_limiter.set_deadline(deadline)
+
+    # Create missing indexes on the first invocation of a fresh container
+    indexes.ensure_indexes_once(clients.mongo_db())
+
+    try:
+        updates, revisions, propogates = main(offset, date_since_days, fan_out, run_id)
+    except DeadlineExceeded as e:
+        continue_page(payload, e)
+        return
     
     logger.info(f"Handler completed - Updates: {len(updates)}, Revisions: {len(revisions)}, Propagations: {len(propogates)}")
+    logger.info(f"HTTP connection reuse: {get_api().transport.stats()}")
+    if get_api().cache:
+        logger.info(f"API response cache: {get_api().cache.stats}")
     # send updates to SQS directly
 
     # if updates:
@@ -174,8 +326,9 @@ def handler(payload):
     #     revision_item = {
     #         'action': 'e_event_extractor',
     #         'payload': {
-    #             'ids': revisions,
-    #             'type': 'updated_bill'
+    #             'ids': [revision['bill_id'] for revision in revisions],
+    #             'type': 'updated_bill',
+    #             'sections': {revision['bill_id']: revision['sections'] for revision in revisions}
     #         }
     #     }
     #     sqs.send_to_nlp_queue(revision_item)
@@ -1,49 +1,85 @@
-import logic.ingest
+import importlib
 import json
+import os
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
-def _handler(event, context):
-    """
-    Main Lambda handler
-    :param event: Input event with 'action' and 'payload'
-    :param context: AWS Lambda context object
-    """
-     # Check if the event is triggered by SQS
-    json_message = None
-    if "Records" in event and event["Records"][0].get("eventSource") == "aws:sqs":
-        print(f"ServiceTier Lambda Invoked from SQS")
-        if len(event["Records"]) > 1:
-            print(f"Got {len(event['Records'])} messages, expected 1 - bailing")
-            return {
-                "statusCode": 400,
-                "body": f"Multiple messages unsupported"
-            }
-        record = event["Records"][0]
-        message_body = json.loads(record["body"])
-        json_message = message_body
-    else:
-        print(f"ServiceTier Lambda Invoked manually")
-        json_message = event
+# Constants
+DISPATCH_WORKERS = int(os.getenv("DISPATCH_WORKERS", 4))  # SQS messages processed concurrently
+
+# Map actions to the modules handling them. Each module is imported by the first message
+# for its action, so a container only loads the SDKs its actions use.
+action_map = {
+    "e_ingest": "logic.ingest"
+}
 
+def _action_handler(action):
+    # import_module caches in sys.modules and holds the import lock, so concurrent records import once
+    return importlib.import_module(action_map[action]).handler
+
+def _is_sqs_event(event):
+    return bool(event.get("Records")) and event["Records"][0].get("eventSource") == "aws:sqs"
+
+def _dispatch(json_message, context=None):
     # Extract the action and payload
     action = json_message.get('action')
     payload = json_message.get('payload', {})
     print(f"Scraper helper Lambda Invoked with action {action}")
 
-    # Map actions to internal functions
-    action_map = {
-        "e_ingest": logic.ingest.handler
-    }
-
     # Route to the appropriate function
     if action in action_map:
-        result = action_map[action](payload)
+        return _action_handler(action)(payload, context)
     else:
         print(f"Unsupported Action {action}")
 
+def _process_record(record, context=None):
+    """
+    Process a single SQS record.
+
+    Returns:
+        bool: True if the message was handled and can be deleted from the queue
+    """
+    try:
+        _dispatch(json.loads(record["body"]), context)
+        return True
+    except Exception as e:
+        print(f"Lambda Exception for message {record.get('messageId')}: {e}")
+        traceback.print_exc()
+        return False
+
+def _handler(event, context):
+    """
+    Main Lambda handler
+    :param event: Input event with 'action' and 'payload', or an SQS batch of them
+    :param context: AWS Lambda context object
+    :return: SQS partial batch response when invoked from SQS, otherwise None
+    """
+     # Check if the event is triggered by SQS
+    if _is_sqs_event(event):
+        records = event["Records"]
+        print(f"ServiceTier Lambda Invoked from SQS with {len(records)} message(s)")
+
+        workers = min(DISPATCH_WORKERS, len(records))
+        if workers <= 1:
+            results = [_process_record(record, context) for record in records]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda record: _process_record(record, context), records))
+
+        # Only failed messages return to the queue for retry
+        failures = [{"itemIdentifier": record["messageId"]} for record, ok in zip(records, results) if not ok]
+        if failures:
+            print(f"{len(failures)}/{len(records)} message(s) failed and will be retried")
+        return {"batchItemFailures": failures}
+
+    print(f"ServiceTier Lambda Invoked manually")
+    _dispatch(event, context)
+
 def handler(event, context):
     try:
-        _handler(event, context)
+        result = _handler(event, context)
+        if result is not None:
+            return result
         return {
             "statusCode": 200,
             "body": "Success"
@@ -51,7 +87,9 @@ def handler(event, context):
     except Exception as e:
         print(f"Lambda Exception {e}")
         traceback.print_exc()
+        if _is_sqs_event(event):
+            return {"batchItemFailures": [{"itemIdentifier": record["messageId"]} for record in event["Records"]]}
         return {
             "statusCode": 500,
             "body": f"Error executing action '{event}': {str(e)}"
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The Lambda images put the shared layer and the function's own directory on the path;
+# mirror that for the NLP function (the scraper's logic package has the same name)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "src", "common", "python"), os.path.join(ROOT, "src", "nlp-lambda")]
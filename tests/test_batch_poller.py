@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+import common_utils.database as database
+import logic.batch_poller as batch_poller
+
+NOW = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+class FakeCollection:
+    """Records the claim query and returns the batch it was given."""
+
+    def __init__(self, batch=None):
+        self.batch = batch
+        self.calls = []
+
+    def find_one_and_update(self, query, update):
+        self.calls.append((query, update))
+        return self.batch
+
+
+@pytest.fixture
+def poller(monkeypatch):
+    """Patch the poller's collaborators and record what it does with them."""
+    calls = {"updates": [], "retried": [], "checked": []}
+    state = {"batch": None, "result": {"status": "not_ready"}}
+
+    monkeypatch.setattr(batch_poller.clients, "extraction_batches_collection", lambda: None)
+    monkeypatch.setattr(batch_poller.database, "claim_batch", lambda collection, batch_id, now, lease_until: state["batch"])
+    monkeypatch.setattr(batch_poller.database, "update_batch", lambda collection, batch_id, data: calls["updates"].append(data))
+
+    def check(batch_id, bill_ids, legacy_rule=True, record=None):
+        calls["checked"].append(batch_id)
+        return state["result"]
+
+    monkeypatch.setattr(batch_poller.event_retriever, "main", check)
+    monkeypatch.setattr(batch_poller.event_retriever, "retry_extraction", lambda bill_ids: calls["retried"].extend(bill_ids))
+    return state, calls
+
+
+def _batch(age, **fields):
+    return dict({"_id": "msgbatch_1", "bill_ids": ["HR1-119", "HR2-119"], "created_at": datetime.now(timezone.utc) - age}, **fields)
+
+
+def test_claim_takes_only_due_pending_batches():
+    collection = FakeCollection({"_id": "msgbatch_1"})
+    lease_until = NOW + timedelta(seconds=batch_poller.LEASE_SECONDS)
+
+    assert database.claim_batch(collection, "msgbatch_1", NOW, lease_until) == {"_id": "msgbatch_1"}
+    assert collection.calls == [(
+        {"_id": "msgbatch_1", "status": "pending", "next_check_at": {"$lte": NOW}},
+        {"$set": {"next_check_at": lease_until}}
+    )]
+
+
+def test_batch_claimed_elsewhere_is_skipped(poller):
+    state, calls = poller
+
+    assert batch_poller.poll_batch("msgbatch_1", NOW) is None
+    assert calls["checked"] == [] and calls["updates"] == []
+
+
+def test_backoff_grows_with_age():
+    young = batch_poller.next_check_delay({"created_at": NOW - timedelta(minutes=1)}, {}, NOW)
+    older = batch_poller.next_check_delay({"created_at": NOW - timedelta(minutes=40)}, {}, NOW)
+    oldest = batch_poller.next_check_delay({"created_at": NOW - timedelta(days=1)}, {}, NOW)
+
+    assert young == batch_poller.MIN_POLL_INTERVAL
+    assert older == 40 * 60 * batch_poller.POLL_BACKOFF
+    assert oldest == batch_poller.MAX_POLL_INTERVAL
+
+
+def test_backoff_resets_when_nearly_done():
+    batch = {"created_at": NOW.replace(tzinfo=None) - timedelta(hours=5)}  # naive, as pymongo returns it
+
+    assert batch_poller.next_check_delay(batch, {"processing": 1, "succeeded": 99, "errored": 0}, NOW) == batch_poller.MIN_POLL_INTERVAL
+    assert batch_poller.next_check_delay(batch, {"processing": 50, "succeeded": 50, "errored": 0}, NOW) == batch_poller.MAX_POLL_INTERVAL
+
+
+def test_unfinished_batch_is_rescheduled(poller):
+    state, calls = poller
+    state["batch"] = _batch(timedelta(hours=1), checks=3)
+
+    assert batch_poller.poll_batch("msgbatch_1", NOW) == "not_ready"
+
+    [update] = calls["updates"]
+    assert update["checks"] == 4
+    assert update["last_status"] == "not_ready"
+    assert update["next_check_at"] > datetime.now(timezone.utc)
+
+
+def test_ended_batch_is_finished(poller):
+    state, calls = poller
+    state["batch"] = _batch(timedelta(hours=1))
+    state["result"] = {"status": "completed"}
+
+    assert batch_poller.poll_batch("msgbatch_1", NOW) == "completed"
+    assert calls["updates"][0]["status"] == "completed"
+    assert calls["retried"] == []
+
+
+def test_gives_up_after_max_checks(poller):
+    state, calls = poller
+    state["batch"] = _batch(timedelta(hours=1), checks=batch_poller.MAX_CHECKS - 1, stored_bill_ids=["HR1-119"])
+
+    assert batch_poller.poll_batch("msgbatch_1", NOW) == "failed"
+    assert calls["updates"][0]["status"] == "failed"
+    # Bills already stored from the batch are not extracted again
+    assert calls["retried"] == ["HR2-119"]
+
+
+def test_gives_up_after_expiry(poller):
+    state, calls = poller
+    expired = datetime.now(timezone.utc) - batch_poller.EXPIRY_GRACE - timedelta(minutes=1)
+    state["batch"] = _batch(timedelta(days=2), expires_at=expired)
+
+    assert batch_poller.poll_batch("msgbatch_1", NOW) == "failed"
+    assert calls["retried"] == ["HR1-119", "HR2-119"]
+
+
+def test_batch_without_expiry_uses_lifetime(poller):
+    state, calls = poller
+    state["batch"] = _batch(batch_poller.BATCH_LIFETIME + timedelta(hours=1))
+
+    # Expired an hour ago, still within the grace period
+    assert batch_poller.poll_batch("msgbatch_1", NOW) == "not_ready"
+    assert calls["retried"] == []
@@ -0,0 +1,71 @@
+import json
+import logic.event_extractor as event_extractor
+from logic.event_extractor import LARGE_MODEL, SMALL_MODEL, BatchPacker
+
+
+def _request(bill_id, i, model=SMALL_MODEL, text="x"):
+    return {
+        "custom_id": f"{bill_id}__{i}__{'0' * event_extractor.CACHE_KEY_LENGTH}",
+        "params": {"model": model, "messages": [{"role": "user", "content": text}]},
+    }
+
+
+def test_parse_custom_id():
+    key = event_extractor.cache_key(SMALL_MODEL, "bill text")
+    custom_id = event_extractor.CHUNK_SEPARATOR.join(["HR1-119", "2", key])
+
+    assert event_extractor.parse_custom_id(custom_id) == ("HR1-119", key)
+    assert len(custom_id) <= 64
+
+
+def test_parse_custom_id_before_caching():
+    # Batches submitted before chunking or caching are still retrieved
+    assert event_extractor.parse_custom_id("HR1-119") == ("HR1-119", None)
+    assert event_extractor.parse_custom_id("HR1-119__0") == ("HR1-119", None)
+
+
+def test_packer_separates_tiers():
+    packer = BatchPacker()
+
+    assert packer.add("S1-119", [_request("S1-119", 0)]) == []
+    assert packer.add("HR1-119", [_request("HR1-119", 0), _request("HR1-119", 1, model=LARGE_MODEL)]) == []
+    batches = {batch["tier"]: batch for batch in packer.flush()}
+
+    # One large chunk sends every chunk of the bill to the large-model batch
+    assert batches[SMALL_MODEL]["bill_ids"] == ["S1-119"]
+    assert batches[LARGE_MODEL]["bill_ids"] == ["HR1-119"]
+    assert len(batches[LARGE_MODEL]["requests"]) == 2
+    assert packer.flush() == []
+
+
+def test_packer_closes_batch_at_request_limit():
+    packer = BatchPacker(max_requests=3)
+
+    assert packer.add("S1-119", [_request("S1-119", 0), _request("S1-119", 1)]) == []
+    closed = packer.add("S2-119", [_request("S2-119", 0), _request("S2-119", 1)])
+
+    # The chunks of a bill are never split across batches
+    assert [batch["bill_ids"] for batch in closed] == [["S1-119"]]
+    assert [batch["bill_ids"] for batch in packer.flush()] == [["S2-119"]]
+
+
+def test_packer_closes_batch_at_byte_limit():
+    request = _request("S1-119", 0, text="x" * 100)
+    size = len(json.dumps(request))
+    packer = BatchPacker(max_bytes=size * 2)
+
+    assert packer.add("S1-119", [request]) == []
+    assert packer.add("S2-119", [_request("S2-119", 0, text="x" * 100)]) == []
+    closed = packer.add("S3-119", [_request("S3-119", 0, text="x" * 100)])
+
+    assert [batch["bill_ids"] for batch in closed] == [["S1-119", "S2-119"]]
+    assert closed[0]["bytes"] <= size * 2
+
+
+def test_packer_keeps_oversized_bill_whole():
+    packer = BatchPacker(max_requests=1)
+
+    closed = packer.add("HR1-119", [_request("HR1-119", i) for i in range(3)])
+
+    assert closed == []
+    assert len(packer.flush()[0]["requests"]) == 3
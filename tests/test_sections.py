@@ -0,0 +1,72 @@
+import common_utils.sections as sections
+
+BILL = (
+    "A BILL To test sections. "
+    "SECTION 1. SHORT TITLE. This Act may be cited as the Test Act. "
+    "SEC. 2. FUNDING. There are authorized $5,000,000 for fiscal year 2026. "
+    "SEC. 3. REPORT. The Secretary shall submit a report."
+)
+
+
+def test_compare_classifies_sections():
+    old = sections.section_hashes(BILL)
+    new = sections.section_hashes(
+        BILL.replace("$5,000,000", "$9,000,000").replace("SEC. 3. REPORT. The Secretary shall submit a report.", "")
+        + " SEC. 4. SUNSET. This Act expires in 2030."
+    )
+
+    result = sections.compare(old, new)
+
+    assert result["changed"] == ["SEC. 2"]
+    assert result["added"] == ["SEC. 4"]
+    assert result["removed"] == ["SEC. 3"]
+    assert result["unchanged"] == [sections.PREAMBLE, "SEC. 1"]
+
+
+def test_compare_ignores_whitespace_and_case():
+    reflowed = BILL.replace("This Act may be cited", "This  act\nmay be cited")
+
+    result = sections.compare(sections.section_hashes(BILL), sections.section_hashes(reflowed))
+
+    assert not (result["changed"] or result["added"] or result["removed"])
+
+
+def test_compare_without_hashes_is_none():
+    assert sections.compare(None, sections.section_hashes(BILL)) is None
+    assert sections.compare(sections.section_hashes(BILL), []) is None
+
+
+def test_chunk_text_empty():
+    assert sections.chunk_text("", 100) == [""]
+
+
+def test_chunk_text_fits():
+    assert sections.chunk_text(BILL, len(BILL)) == [BILL]
+
+
+def test_chunk_text_cuts_at_section_headers():
+    chunks = sections.chunk_text(BILL, 90)
+
+    assert all(len(chunk) <= 90 for chunk in chunks)
+    assert [chunk[:6] for chunk in chunks[1:]] == ["SEC. 2", "SEC. 3"]
+    assert "".join(chunks).replace(" ", "") == BILL.replace(" ", "")
+
+
+def test_chunk_text_prefers_title_headers():
+    first = "SEC. 1. PURPOSE. " + "Purpose text. " * 4
+    second = "TITLE II—FUNDING SEC. 2. AMOUNTS. " + "Amounts text. " * 4
+    text = first + second
+
+    # The title header still fits in the first chunk, which is over half full by then
+    chunks = sections.chunk_text(text, 120)
+
+    assert chunks == [first.strip(), second.strip()]
+
+
+def test_chunk_text_splits_long_section_at_sentences():
+    text = "SEC. 1. LONG. " + "This sentence is part of one long section. " * 10
+
+    chunks = sections.chunk_text(text, 100)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
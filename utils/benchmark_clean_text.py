@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for definitions.normalize.clean_text against the original
+multi-pass CongressGovAPI._clean_text.
+
+Fixtures are raw (uncleaned) extracted bill text. Pass text files, or bill IDs
+to download and extract with CongressGovAPI (requires CONGRESS_API_KEY):
+
+    python benchmark_clean_text.py fixtures/hr1-119.txt
+    python benchmark_clean_text.py --bills HR1-119 S1744-119
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+# Add the scraper lambda to the Python path so we can import definitions
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'scraper-lambda'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'common', 'python'))
+
+import definitions.normalize as normalize
+
+
+def legacy_clean_text(text):
+    """The original CongressGovAPI._clean_text, kept verbatim for comparison."""
+    if not text:
+        return ""
+
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r'(\w)-\s+(\w)', r'\1\2', text)
+    text = re.sub(r'(\d+)\s*\.\s*(\d+)', r'\1.\2', text)
+    text = text.replace('â€™', "'")
+    text = text.replace('â€œ', '"')
+    text = text.replace('â€', '"')
+    text = text.replace('â€"', '-')
+    text = text.replace('â€"', '--')
+    text = ''.join(char for char in text if char.isprintable() or char in '\n\t')
+    text = text.strip()
+    return text
+
+
+def fetch_raw_text(bill_ids):
+    """Download the latest text version of each bill and extract it without cleaning."""
+    from definitions.api import CongressGovAPI
+    from definitions.congress import Bill
+
+    api = CongressGovAPI(os.environ.get("CONGRESS_API_KEY"), cache=False)
+    fixtures = {}
+    for bill_id in bill_ids:
+        bill_num_with_type, congress = bill_id.split('-')
+        bill_type = ''.join(c for c in bill_num_with_type if c.isalpha()).lower()
+        bill_number = ''.join(c for c in bill_num_with_type if c.isdigit())
+
+        text_versions = api.get_bill_text(congress, bill_type, bill_number)
+        for url in Bill._document_urls(text_versions):
+            response = api.fetch_with_retry(api.transport.get, url)
+            if response.status_code != 200:
+                continue
+            if 'pdf' in url:
+                fixtures[bill_id] = api._extract_text_from_pdf(response.content)
+            else:
+                fixtures[bill_id] = api._extract_text_from_html(response.text, base_url=url)
+            break
+    return fixtures
+
+
+def best_of(func, text, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="Raw extracted bill text files")
+    parser.add_argument("--bills", nargs="*", default=[], help="Bill IDs to download, e.g. HR1-119")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fixtures = {}
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            fixtures[os.path.basename(path)] = f.read()
+    if args.bills:
+        fixtures.update(fetch_raw_text(args.bills))
+
+    if not fixtures:
+        parser.error("no fixtures given")
+
+    print(f"{'fixture':<30} {'chars':>12} {'legacy ms':>12} {'new ms':>12} {'stream ms':>12} {'speedup':>8}")
+    for name, text in fixtures.items():
+        legacy_time, expected = best_of(legacy_clean_text, text, args.repeat)
+        new_time, result = best_of(normalize.clean_text, text, args.repeat)
+        stream_time, streamed = best_of(lambda t: ''.join(normalize.iter_clean_text([t])), text, args.repeat)
+
+        if result != expected or streamed != expected:
+            print(f"MISMATCH for {name}")
+            sys.exit(1)
+
+        print(f"{name:<30} {len(text):>12,} {legacy_time * 1000:>12.1f} {new_time * 1000:>12.1f} "
+              f"{stream_time * 1000:>12.1f} {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
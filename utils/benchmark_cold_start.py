@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Cold start cost of each Lambda action, measured in a fresh interpreter per action:
+dispatcher import, action module import (which is when its SDKs load) and, with
+--invoke, the first call of the handler with a sample payload (which is when
+clients are built). First calls hit the real services configured in the environment.
+
+    python benchmark_cold_start.py
+    python benchmark_cold_start.py --invoke e_event_retriever '{"batch_id": "msgbatch_...", "bill_ids": []}'
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+LAMBDAS = {
+    "scraper-lambda": ["e_ingest"],
+    "nlp-lambda": ["e_event_extractor", "e_event_retriever", "e_batch_poller"],
+}
+
+
+def child(lambda_dir, action, payload):
+    """Runs inside the fresh interpreter; prints timings as JSON."""
+    sys.path.insert(0, os.path.join(ROOT, lambda_dir))
+    sys.path.insert(0, os.path.join(ROOT, 'common', 'python'))
+
+    timings = {}
+    start = time.perf_counter()
+    import service_dispatcher
+    timings["dispatcher_import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    handler = service_dispatcher._action_handler(action)
+    timings["action_import"] = time.perf_counter() - start
+
+    if payload is not None:
+        start = time.perf_counter()
+        try:
+            handler(payload)
+        except Exception as e:
+            timings["first_call_failed"] = str(e)
+        timings["first_call"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            handler(payload)
+        except Exception:
+            pass
+        timings["warm_call"] = time.perf_counter() - start
+
+    print(json.dumps(timings))
+
+
+def measure(lambda_dir, action, payload):
+    command = [sys.executable, __file__, "--child", lambda_dir, action]
+    if payload is not None:
+        command.append(json.dumps(payload))
+    start = time.perf_counter()
+    output = subprocess.run(command, capture_output=True, text=True)
+    total = time.perf_counter() - start
+    if output.returncode != 0:
+        return {"failed": output.stderr.strip().splitlines()[-1] if output.stderr else "unknown"}
+
+    timings = json.loads(output.stdout.strip().splitlines()[-1])
+    timings["process_total"] = total
+    return timings
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        lambda_dir, action = sys.argv[2], sys.argv[3]
+        child(lambda_dir, action, json.loads(sys.argv[4]) if len(sys.argv) > 4 else None)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invoke", nargs=2, action="append", default=[], metavar=("ACTION", "PAYLOAD"),
+                        help="Also time the first and second handler calls of ACTION with a JSON payload")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payloads = {action: json.loads(payload) for action, payload in args.invoke}
+
+    print(f"{'action':<20} {'dispatcher ms':>14} {'import ms':>10} {'first call ms':>14} {'warm call ms':>13} {'process ms':>11}")
+    for lambda_dir, actions in LAMBDAS.items():
+        for action in actions:
+            runs = [measure(lambda_dir, action, payloads.get(action)) for _ in range(args.repeat)]
+            if any("failed" in run for run in runs):
+                print(f"{action:<20} failed: {next(run['failed'] for run in runs if 'failed' in run)}")
+                continue
+
+            # Best of the runs: the least disturbed by the rest of the machine
+            best = min(runs, key=lambda run: run["process_total"])
+            columns = [best.get(key) for key in ("dispatcher_import", "action_import", "first_call", "warm_call", "process_total")]
+            print(f"{action:<20} " + " ".join(
+                f"{value * 1000:>{width}.1f}" if value is not None else f"{'-':>{width}}"
+                for value, width in zip(columns, (14, 10, 14, 13, 11))))
+            if best.get("first_call_failed"):
+                print(f"  first call raised: {best['first_call_failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Lookup latency of the bills/events access patterns as the collections grow, with
+and without the indexes declared in common_utils.indexes.
+
+Uses a scratch database (dropped afterwards) on the cluster in DB_URI:
+
+    python benchmark_indexes.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pymongo.mongo_client import MongoClient
+from pymongo.server_api import ServerApi
+
+# Add the common layer to the Python path so we can import common_utils
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'common', 'python'))
+
+import common_utils.database as database
+import common_utils.indexes as indexes
+
+EVENTS_PER_BILL = 3
+
+
+def populate(db, start, end):
+    """Add bills start..end-1 with EVENTS_PER_BILL events each."""
+    bills = []
+    events = []
+    for i in range(start, end):
+        bill_id = f"HR{i}-119"
+        event_ids = [f"{bill_id}-{n}" for n in range(EVENTS_PER_BILL)]
+        bills.append({
+            "bill_id": bill_id,
+            "title": f"Bill {i}",
+            "latest_action_date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "events": event_ids,
+            "text_length": 1000,
+        })
+        # Same shape as event_retriever.process_event, without the embedding
+        events.extend({
+            "id": event_id,
+            "bill": {"id": bill_id, "title": f"Bill {i}", "date": bills[-1]["latest_action_date"], "latest_action": None},
+            "text": "x" * 200,
+        } for event_id in event_ids)
+    db["bills"].insert_many(bills, ordered=False)
+    db["events"].insert_many(events, ordered=False)
+
+
+def time_lookups(db, size, lookups):
+    """Median milliseconds per access pattern over random bills."""
+    bill_ids = [f"HR{random.randrange(size)}-119" for _ in range(lookups)]
+    patterns = {
+        "get_bill": lambda bill_id: database.get_bill(db["bills"], bill_id, profile="identity"),
+        "get_bills x50": lambda bill_id: database.get_bills(db["bills"], random.sample(bill_ids, min(50, lookups)), profile="identity"),
+        "events by bill.id": lambda bill_id: list(db["events"].find({"bill.id": bill_id}, {"id": 1})),
+        "get_events": lambda bill_id: database.get_events(db["events"], [f"{bill_id}-0", f"{bill_id}-1"], projection={"id": 1}),
+    }
+
+    results = {}
+    for name, lookup in patterns.items():
+        timings = []
+        for bill_id in bill_ids:
+            start = time.perf_counter()
+            lookup(bill_id)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results[name] = timings[len(timings) // 2] * 1000
+    return results
+
+
+def drop_declared_indexes(db):
+    for collection_name, declared in indexes.REQUIRED_INDEXES.items():
+        existing = {index["name"] for index in db[collection_name].list_indexes()}
+        for index in declared:
+            if index["name"] in existing:
+                db[collection_name].drop_index(index["name"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="*", type=int, default=[1000, 10000, 50000], help="Bill counts to measure at")
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--database", default="auxiom_index_benchmark")
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get("DB_URI"), server_api=ServerApi('1'))
+    if args.database == "auxiom_database":
+        parser.error("refusing to benchmark against the production database")
+    client.drop_database(args.database)
+    db = client[args.database]
+
+    print(f"{'bills':>8} {'pattern':<20} {'no index ms':>12} {'indexed ms':>12} {'speedup':>8}")
+    try:
+        populated = 0
+        for size in sorted(args.sizes):
+            populate(db, populated, size)
+            populated = size
+
+            drop_declared_indexes(db)
+            scan = time_lookups(db, size, args.lookups)
+            indexes.ensure_indexes(db)
+            indexed = time_lookups(db, size, args.lookups)
+
+            for name in scan:
+                print(f"{size:>8,} {name:<20} {scan[name]:>12.2f} {indexed[name]:>12.2f} {scan[name] / indexed[name]:>7.1f}x")
+    finally:
+        client.drop_database(args.database)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import sys
+from pymongo.mongo_client import MongoClient
+from pymongo.server_api import ServerApi
+
+# Add the common layer to the Python path so we can import common_utils
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'common', 'python'))
+
+import common_utils.indexes as indexes
+
+# Run at deploy: creates missing indexes, then reports what is still missing or unused.
+# Pass --report to only report.
+uri = os.environ.get("DB_URI")
+
+client = MongoClient(uri, server_api=ServerApi('1'))
+db = client['auxiom_database']
+
+if "--report" not in sys.argv:
+    created = indexes.ensure_indexes(db)
+    print(f"Created {sum(len(names) for names in created.values())} indexes")
+
+for collection_name, report in indexes.index_report(db).items():
+    print(f"{collection_name}:")
+    print(f"- Missing: {report['missing'] or 'none'}")
+    print(f"- Undeclared: {report['undeclared'] or 'none'}")
+    print(f"- Unused since server start: {report['unused'] or 'none'}")
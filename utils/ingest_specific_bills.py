@@ -4,7 +4,9 @@ from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 import sys
 import common_utils.database as database
+import common_utils.sections as sections
 import common_utils.sqs as sqs
+import common_utils.text_store as text_store
 from datetime import datetime
 import logging
 
@@ -39,6 +41,8 @@ def main(bill_ids):
     propogates = []
     seen = set()
     
+    bills = []
+    queued = set()
     for bill_id_str in bill_ids:
         try:
             # Parse bill_id_str (e.g., 'S1744-119' -> type='S', number='1744', congress='119')
@@ -69,96 +73,115 @@ def main(bill_ids):
                 logger.debug(f"Skipping historical bill from {published_date}")
                 continue
                 
-            # Check if bill is already in database
             bill_id = bill.get_id()
 
-            if bill_id in seen:
+            if bill_id in queued:
                 logger.debug(f"Bill {bill_id} already processed in this batch")
                 continue
 
-            existing_bill = database.get_bill(bills_collection, bill_id)
-
-            logger.info(f"Processing bill {bill_id}: {bill.get_title()[:100]}...")
-            logger.debug(f"  Latest Action Date: {bill.get_latest_action_date()}")
-
             # Skip bills with no text
             if bill.get_text_count() == 0:
                 logger.info(f"  Skipping {bill_id} - no text available (text_count=0)")
                 continue
 
-            # Convert bill to dictionary with all information
+            queued.add(bill_id)
+            bills.append(bill)
+
+        except Exception as e:
+            logger.error(f"Error processing bill {bill_id_str}: {e}", exc_info=True)
+
+    # Check which bills are already in the database with one query
+    existing_bills = database.get_bills(bills_collection, queued, profile="ingest_compare")
+
+    pending = []
+    for bill in bills:
+        try:
+            bill_id = bill.get_id()
+            existing_bill = existing_bills.get(bill_id)
+
+            logger.info(f"Processing bill {bill_id}: {bill.get_title()[:100]}...")
+            logger.debug(f"  Latest Action Date: {bill.get_latest_action_date()}")
+
+            # Convert bill to dictionary with all information, reusing stored text if unchanged
+            bill.set_existing(existing_bill)
             bill_data = bill.to_dict(text=True)
-            new_text_length = len(bill_data.get('text', ''))
+            new_text_length = bill_data.get('text_length') or 0
             logger.debug(f"  Fetched bill text: {new_text_length} characters")
+            logger.debug(f"  Subjects: {bill_data.get('subjects')}")
 
-            subjects = bill.get_subjects()
-            logger.debug(f"  Subjects: {subjects}")
-
+            change = None
+            changed_sections = None
             if existing_bill:
                 # Bill exists - determine what type of update is needed
                 logger.info(f"  Bill {bill_id} exists in database - checking for changes")
                 
-                existing_text_length = len(existing_bill.get('text', ''))
+                existing_text_length = existing_bill.get('text_length') or 0
                 existing_action_date = existing_bill.get('latest_action_date', '')
                 new_action_date = bill_data.get('latest_action_date', '')
                 
                 logger.debug(f"  Existing text length: {existing_text_length}, New text length: {new_text_length}")
                 logger.debug(f"  Existing action date: {existing_action_date}, New action date: {new_action_date}")
                 
-                # Determine change type BEFORE updating
-                change_detected = False
-                
+                section_changes = sections.compare(existing_bill.get('section_hashes'), bill_data.get('section_hashes'))
+
                 # First time seeing this bill's text
                 if existing_text_length == 0 and new_text_length > 0:
                     logger.info(f"  ✓ NEW TEXT detected for {bill_id} ({new_text_length} chars)")
-                    updates.append(bill_id)
-                    change_detected = True
-                # Significant revision has been made (text length changed by >1000 chars)
-                elif existing_text_length > 0 and abs(existing_text_length - new_text_length) > 1000:
+                    change = 'update'
+                # One or more sections were edited, added or removed
+                elif section_changes and (section_changes['changed'] or section_changes['added'] or section_changes['removed']):
+                    changed_sections = section_changes['changed'] + section_changes['added']
+                    logger.info(f"  ✓ REVISION detected for {bill_id} ({len(section_changes['changed'])} changed, "
+                                f"{len(section_changes['added'])} added, {len(section_changes['removed'])} removed sections)")
+                    change = 'revision'
+                # Bills stored before section hashes: significant revision (text length changed by >1000 chars)
+                elif section_changes is None and existing_text_length > 0 and abs(existing_text_length - new_text_length) > 1000:
                     text_diff = new_text_length - existing_text_length
                     logger.info(f"  ✓ REVISION detected for {bill_id} (text changed by {text_diff:+d} chars)")
-                    revisions.append(bill_id)
-                    change_detected = True
+                    change = 'revision'
                 # Action date changed but no significant text change
                 elif existing_action_date != new_action_date:
                     logger.info(f"  ✓ PROPAGATION detected for {bill_id} (action date: {existing_action_date} → {new_action_date})")
-                    propogates.append({
-                        'bill_id': bill_id, 
-                        'latest_action': bill.get_latest_action(), 
-                        'date': new_action_date, 
-                        'status': bill_data.get('status', '')
-                    })
-                    change_detected = True
+                    change = 'propagation'
                 else:
                     logger.debug(f"  No significant changes detected for {bill_id}")
-                
-                # Now update the bill in database
-                success = database.update_bill(bills_collection, bill_data)
-                
-                if success:
-                    logger.debug(f"  Database updated successfully for {bill_id}")
-                elif not change_detected:
-                    logger.debug(f"  No database changes needed for {bill_id}")
-                else:
-                    logger.warning(f"  Database update returned no changes for {bill_id}")
                     
             else:
                 # Bill doesn't exist - insert as new
                 logger.info(f"  Bill {bill_id} is NEW - inserting into database")
                 logger.debug(f"  Text length: {new_text_length}, Action date: {bill_data.get('latest_action_date', '')}")
-                
-                success = database.insert_bill(bills_collection, bill_data)
-                
-                if success:
-                    logger.info(f"  ✓ NEW BILL inserted: {bill_id}")
-                    updates.append(bill_id)
-                else:
-                    logger.error(f"  Failed to insert new bill {bill_id}")
-            
-            seen.add(bill_id)
+                change = 'update'
+
+            # Move the text out of line when BILL_TEXT_STORE is set
+            text_store.externalize(bill_data)
+            pending.append((bill, bill_data, change, changed_sections))
 
         except Exception as e:
-            logger.error(f"Error processing bill {bill_id_str}: {e}", exc_info=True)
+            logger.error(f"Error processing bill {bill.get_id()}: {e}", exc_info=True)
+
+    # Write every bill with one bulk upsert and only report changes that were stored
+    results = database.upsert_bills(bills_collection, [bill_data for _, bill_data, _, _ in pending])
+    for (bill, bill_data, change, changed_sections), result in zip(pending, results):
+        bill_id = bill.get_id()
+        if result == "failed":
+            logger.error(f"  Failed to write bill {bill_id}")
+            continue
+
+        if result == "inserted":
+            logger.info(f"  ✓ NEW BILL inserted: {bill_id}")
+        if change == 'update':
+            updates.append(bill_id)
+        elif change == 'revision':
+            # None means the whole bill needs re-extraction
+            revisions.append({'bill_id': bill_id, 'sections': changed_sections})
+        elif change == 'propagation':
+            propogates.append({
+                'bill_id': bill_id, 
+                'latest_action': bill.get_latest_action(), 
+                'date': bill_data.get('latest_action_date', ''), 
+                'status': bill_data.get('status', '')
+            })
+        seen.add(bill_id)
 
     logger.info(f"="*60)
     logger.info(f"SUMMARY: Processed {len(seen)} bills")
@@ -170,7 +193,7 @@ def main(bill_ids):
     if updates:
         logger.info(f"New bill IDs: {updates}")
     if revisions:
-        logger.info(f"Revised bill IDs: {revisions}")
+        logger.info(f"Revised bill IDs: {[r['bill_id'] for r in revisions]}")
     if propogates:
         logger.info(f"Propagated bill IDs: {[p['bill_id'] for p in propogates]}")
 
@@ -17,7 +17,7 @@ db = client['auxiom_database']
 bills_collection = db['bills']
 
 
-bills = database.get_all_bills(bills_collection)
+bills = database.get_all_bills(bills_collection, profile="text_stats")
 deleted = []
 deleted_error_messages = []
 
@@ -25,8 +25,7 @@ for bill in bills:
     bill_id = bill.get('bill_id')
 
     # if text length is 59 characters (error message), delete
-    bill_text = bill.get('text', '')
-    if len(bill_text) == 59:
+    if bill.get('text_length') == 59:
         deleted_error_messages.append(bill_id)
         database.delete_bill(bills_collection, bill_id)
   
@@ -7,6 +7,8 @@ from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 import common_utils.s3 as s3
 import common_utils.database as database
+import common_utils.sections as sections
+import common_utils.text_store as text_store
 
 
 # Replace with your actual API key
@@ -49,7 +51,7 @@ def process_requery_items(requery_objects):
             print(f"\nProcessing requery for bill {bill_id} (request: {field})")
             
             # Get existing bill from database
-            existing_bill = database.get_bill(bills_collection, bill_id)
+            existing_bill = database.get_bill(bills_collection, bill_id, profile="identity")
             if not existing_bill:
                 print(f"Warning: Bill {bill_id} not found in database. Removing from requery.")
                 updated.append(bill_id)
@@ -70,8 +72,14 @@ def process_requery_items(requery_objects):
                         print(f"Successfully retrieved {len(text)} characters of text for bill {bill_id}")
                         
                         # Update the database with the new text
-                        update_data = {"text": text, "bill_id": bill_id}
-                        success = database.update_bill(bills_collection, update_data)
+                        update_data = {
+                            "text": text,
+                            "text_length": len(text),
+                            "text_version": bill.data.get("text_version"),
+                            "section_hashes": sections.section_hashes(text),
+                            "bill_id": bill_id
+                        }
+                        success = database.update_bill(bills_collection, text_store.externalize(update_data))
                         
                         if success:
                             updated.append(bill_id)
@@ -14,6 +14,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 nlp = spacy.load("en_core_web_sm")
 
 import common_utils.database as database
+import common_utils.text_store as text_store
 
 GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
 uri = os.environ.get("DB_URI")
@@ -67,7 +68,7 @@ def vectorize_bill_text(bill):
         dict: Bill update data with embedding, or None if text is missing
     """
     bill_id = bill.get('bill_id')
-    text = bill.get('text')
+    text = text_store.load_text(bill)
     title = bill.get('title')
     people = ' '.join([person.get('name', '') for person in bill.get('people', [])]) if bill.get('people', []) else ''
     summary = bill.get('summary', '')
@@ -79,7 +80,7 @@ def vectorize_bill_text(bill):
         print(f"Warning: Bill {bill_id} has no text content. Skipping.")
         return None
     
-    print(f"Vectorizing bill {bill_id} (text length: {len(full_text)} chars). Originally {len(bill.get('text', ''))} chars.")
+    print(f"Vectorizing bill {bill_id} (text length: {len(full_text)} chars). Originally {len(bill.get('text') or '')} chars.")
     
     try:
         # Generate embedding for the bill text
@@ -126,7 +127,7 @@ def vectorize_all_bills(offset = 564):
     
     # Get all bills from database
     print("Fetching all bills from database...")
-    bills = database.get_all_bills(bills_collection)
+    bills = database.get_all_bills(bills_collection, profile="vectorize_input")
     
     if not bills:
         print("No bills found in database.")
@@ -146,7 +147,7 @@ def vectorize_all_bills(offset = 564):
         print(f"\n[{i}/{len(bills)}] Processing bill {bill_id}")
         
         # Check if already has embedding
-        if bill.get('text_embedding'):
+        if bill.get('has_text_embedding'):
             print(f"Bill {bill_id} already has text_embedding. Skipping.")
             skipped_count += 1
             continue